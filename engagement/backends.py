@@ -0,0 +1,243 @@
+"""
+Detector backends.
+A backend turns a frame into per-face observations (box, engagement state,
+eye evidence); EngagementEngine does the scoring, seats, alerts and drawing.
+Backends are created per engine because some (FaceMesh tracking mode) carry
+per-stream state.
+"""
+
+import time
+
+import numpy as np
+import cv2
+
+from engagement.detectors import get_detector_pool, get_dnn_pool, has_dnn_model, has_mediapipe
+from engagement.metrics import METRICS
+
+ENGAGED, DISTRACTED, HEAD_DOWN = "ENGAGED", "DISTRACTED", "HEAD DOWN"
+
+
+def face_observation(box, state: str, eye_count: int, eyes=(), track_id=None, pose=None) -> dict:
+    """One detected face: full-resolution x, y, w, h box plus its engagement evidence."""
+    return {"box": tuple(int(v) for v in box), "state": state, "eye_count": eye_count,
+            "eyes": list(eyes), "track_id": track_id, "pose": pose}
+
+
+class DetectorBackend:
+    """Face / engagement-cue detector used by EngagementEngine."""
+
+    name = "base"
+    label = "Base"
+    batch_size = 1          # frames per observe_batch() call the upload loops should collect
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def observe(self, frame: np.ndarray, gray: np.ndarray):
+        """Return (faces, full_pass) where faces is a list of face_observation dicts."""
+        raise NotImplementedError
+
+    def observe_batch(self, frames: list, grays: list) -> list:
+        """observe() for several frames in order; batching backends override this with one inference call."""
+        return [self.observe(f, g) for f, g in zip(frames, grays)]
+
+    def observe_regions(self, frame: np.ndarray, gray: np.ndarray, rects: list):
+        """Faces inside full-resolution (x0, y0, x1, y1) rects as face_observation dicts, for motion gating.
+
+        None if the backend can only observe whole frames.
+        """
+        return None
+
+    def close(self):
+        pass
+
+
+def eye_observations(det, gray: np.ndarray, boxes, track_ids=()) -> list:
+    """Classify each face box by the eye cascade run on its full-resolution ROI."""
+    faces = []
+    for i, (x, y, fw, fh) in enumerate(boxes):
+        eyes = det.eye_cascade.detectMultiScale(
+            gray[y:y+fh, x:x+fw], scaleFactor=1.1, minNeighbors=5, minSize=(15, 15)
+        )
+        # No eyes visible → possibly head down; one eye → turned away / distracted
+        n = len(eyes)
+        state = HEAD_DOWN if n == 0 else DISTRACTED if n < 2 else ENGAGED
+        faces.append(face_observation(
+            (x, y, fw, fh), state, n,
+            eyes=[(x + ex, y + ey, ew, eh) for (ex, ey, ew, eh) in eyes],
+            track_id=track_ids[i] if track_ids else None
+        ))
+    return faces
+
+
+def _assign_track_ids(engine, boxes: list) -> list:
+    """Stable IDs for boxes from a detector without identities, via the engine's IoU tracker."""
+    tracker = engine.tracker
+    if tracker is None:
+        return []
+    tracks = tracker.update(boxes, full=True)
+    ids = {t.box: t.track_id for t in tracks if t.misses == 0}
+    return [ids.get(tuple(int(v) for v in b)) for b in boxes]
+
+
+class EyeCascadeBackend(DetectorBackend):
+    """A face detector followed by the per-face Haar eye cascade, as two separately callable stages."""
+
+    def detect_faces(self, frames: list, grays: list) -> list:
+        """(boxes, track_ids, full_pass) per frame, boxes in full-resolution pixels."""
+        raise NotImplementedError
+
+    def classify_faces(self, grays: list, detections: list) -> list:
+        """observe_batch() output for detect_faces() results."""
+        with self.engine.detectors.acquire() as det:
+            return [(eye_observations(det, gray, boxes, track_ids), full_pass)
+                    for gray, (boxes, track_ids, full_pass) in zip(grays, detections)]
+
+    def observe(self, frame, gray):
+        return self.observe_batch([frame], [gray])[0]
+
+    def observe_batch(self, frames, grays):
+        timing = METRICS.enabled
+        t0 = time.perf_counter() if timing else 0.0
+        detections = self.detect_faces(frames, grays)
+        if timing:
+            METRICS.since("face_detect", t0)
+            t0 = time.perf_counter()
+        observations = self.classify_faces(grays, detections)
+        if timing:
+            METRICS.since("eye_detect", t0)
+        return observations
+
+
+class HaarBackend(EyeCascadeBackend):
+    """Haar face cascade (with tracker / region mask / seats) plus a per-face eye cascade."""
+
+    name = "haar"
+    label = "OpenCV Haar Cascades"
+
+    @classmethod
+    def available(cls) -> bool:
+        return get_detector_pool().available
+
+    def detect_faces(self, frames, grays):
+        with self.engine.detectors.acquire() as det:
+            return [self.engine._detect_faces(gray, det) for gray in grays]
+
+    def observe_regions(self, frame, gray, rects):
+        # Untracked: the tracker only sees whole-frame passes
+        with self.engine.detectors.acquire() as det:
+            return eye_observations(det, gray, self.engine._detect_in_rects(gray, rects, det))
+
+
+class DnnBackend(EyeCascadeBackend):
+    """CenterFace DNN face detector (cv2.dnn, CPU) with the Haar eye cascade for engagement state.
+
+    Only the face detector differs from HaarBackend, so fps and detection counts
+    compare like for like. detect_faces() stacks frames into one forward pass; the
+    seat map and learned region mask filter its detections by box centre.
+    """
+
+    name = "dnn"
+    label = "OpenCV DNN (CenterFace)"
+    batch_size = 4
+
+    @classmethod
+    def available(cls) -> bool:
+        return has_dnn_model() and get_detector_pool().available and get_dnn_pool().available
+
+    def detect_faces(self, frames, grays):
+        with get_dnn_pool().acquire() as net:
+            all_boxes = net.detect(frames, width=self.engine.detection_width)     # None: full frame width
+        out = []
+        for gray, boxes in zip(grays, all_boxes):
+            h, w = gray.shape[:2]
+            boxes = self.engine._limit_to_regions([tuple(int(v) for v in b) for b in boxes], w, h)
+            out.append((boxes, _assign_track_ids(self.engine, boxes), True))
+        return out
+
+
+# FaceMesh landmark indices used for head pose
+_LM_FOREHEAD, _LM_CHIN, _LM_EYE_L, _LM_EYE_R = 10, 152, 33, 263
+
+
+def head_pose(landmarks: np.ndarray) -> tuple:
+    """(pitch, yaw) in degrees from (N, 3) FaceMesh landmarks in pixel units.
+
+    The face normal is the cross product of the forehead→chin and eye→eye lines;
+    positive pitch means the head is tilted down, positive yaw turned to the image right.
+    """
+    right = landmarks[_LM_EYE_R] - landmarks[_LM_EYE_L]
+    down = landmarks[_LM_CHIN] - landmarks[_LM_FOREHEAD]
+    n = np.cross(down, right)
+    n /= max(np.linalg.norm(n), 1e-6)
+    pitch = float(np.degrees(np.arcsin(np.clip(n[1], -1, 1))))
+    yaw = float(np.degrees(np.arcsin(np.clip(-n[0], -1, 1))))
+    return pitch, yaw
+
+
+class FaceMeshBackend(DetectorBackend):
+    """MediaPipe FaceMesh in tracking mode; engagement from landmark head pose instead of eye cascades.
+
+    Like DnnBackend it sees the whole frame; the seat map and region mask filter its faces by box centre.
+    """
+
+    name = "facemesh"
+    label = "MediaPipe FaceMesh"
+
+    # The forehead→chin line leans back ~12° on a frontal face, so "down" starts well past 0
+    PITCH_DOWN = 30.0
+    YAW_AWAY = 25.0
+    MAX_FACES = 50          # a whole hall, whatever the expected student count
+
+    def __init__(self, engine):
+        super().__init__(engine)
+        import mediapipe as mp
+        self.mesh = mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=False,
+            max_num_faces=self.MAX_FACES,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+
+    @classmethod
+    def available(cls) -> bool:
+        return has_mediapipe()
+
+    def observe(self, frame, gray):
+        h, w = frame.shape[:2]
+        res = self.mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        faces = []
+        for lm in res.multi_face_landmarks or []:
+            pts = np.array([(p.x * w, p.y * h, p.z * w) for p in lm.landmark], dtype=np.float32)
+            x0, y0 = np.clip(pts[:, :2].min(axis=0), 0, None)
+            x1, y1 = np.minimum(pts[:, :2].max(axis=0), (w, h))
+            pitch, yaw = head_pose(pts)
+            if pitch > self.PITCH_DOWN:
+                state, eye_count = HEAD_DOWN, 0
+            elif abs(yaw) > self.YAW_AWAY:
+                state, eye_count = DISTRACTED, 1
+            else:
+                state, eye_count = ENGAGED, 2
+            faces.append(face_observation((x0, y0, x1 - x0, y1 - y0), state, eye_count,
+                                          pose=(round(pitch, 1), round(yaw, 1))))
+
+        kept = set(self.engine._limit_to_regions([f["box"] for f in faces], w, h))
+        faces = [f for f in faces if f["box"] in kept]
+        # FaceMesh has no stable IDs across faces — reuse the IoU tracker to assign them
+        for face, track_id in zip(faces, _assign_track_ids(self.engine, [f["box"] for f in faces])):
+            face["track_id"] = track_id
+        return faces, True
+
+    def close(self):
+        self.mesh.close()
+
+
+BACKENDS = {b.name: b for b in (HaarBackend, DnnBackend, FaceMeshBackend)}
+
+
+def available_backends() -> list:
+    return [name for name, b in BACKENDS.items() if b.available()]
@@ -0,0 +1,266 @@
+"""
+Benchmark suite for the engagement engine.
+Renders deterministic synthetic hall videos (engagement.synthetic), or takes
+real recordings, times every stage of the per-frame hot path, and compares the
+results against a stored baseline. Run as `python -m engagement.benchmark --help`.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from engagement.backends import BACKENDS, HEAD_DOWN, EyeCascadeBackend
+from engagement.display import DisplayEncoder
+from engagement.engine import PROBE_FACES, EngagementEngine
+from engagement.results import render_annotations
+from engagement.synthetic import SyntheticHall
+
+STAGES = ("decode", "cvtColor", "face_detect", "eye_detect", "scoring", "hud", "display_encode")
+RESOLUTIONS = ((640, 480), (1280, 720), (1920, 1080))
+FACE_COUNTS = (1, 6, 24)
+
+
+def _percentiles(ms: list) -> dict:
+    arr = np.asarray(ms, dtype=np.float64)
+    return {"mean_ms": float(arr.mean()), "p50_ms": float(np.percentile(arr, 50)),
+            "p99_ms": float(np.percentile(arr, 99))}
+
+
+def run_scenario(width: int, height: int, n_faces: int, frames: int = 60, warmup: int = 5,
+                 backend: str = "haar", tracking: bool = False, detection_width: int = 640,
+                 jpeg_quality: int = 75, display_width: int = 800, workdir: str = None, seed: int = 0,
+                 video: str = None) -> dict:
+    """Time each stage over `frames` frames of a synthetic hall video (after `warmup` untimed frames).
+
+    With `video`, that recording is used instead (width and height are taken from
+    it; n_faces is the expected student count). Face / eye detection are timed
+    separately for backends that run them as two stages (Haar, DNN); for other
+    backends the whole observation counts as face_detect. "display_encode" is the
+    downscale to display_width plus JPEG encode the dashboard pays per shown frame.
+
+    Synthetic faces are drawings that only the Haar cascade detects: "recall" is
+    reported for synthetic footage but means nothing for DNN or FaceMesh. Compare
+    their detection counts ("faces_per_frame") on a real recording.
+    """
+    if video is None:
+        hall = SyntheticHall(width, height, n_faces, seed=seed)
+        workdir = workdir or tempfile.gettempdir()
+        path = os.path.join(workdir, f"hall_{width}x{height}_{n_faces}_{seed}.avi")
+        if not os.path.exists(path):
+            hall.write_video(path, warmup + frames)
+    else:
+        hall, path = None, video
+
+    engine = EngagementEngine(backend=backend, tracking=tracking, expected_faces=n_faces,
+                              detection_width=detection_width)
+    be = engine.backend
+    two_stage = isinstance(be, EyeCascadeBackend)
+    display = DisplayEncoder(display_width, jpeg_quality)
+    timings = {s: [] for s in STAGES}
+    totals, found, visible = [], 0, 0
+    cap = cv2.VideoCapture(path)
+    if video is not None:
+        width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    try:
+        for i in range(warmup + frames):
+            t0 = time.perf_counter()
+            ok, frame = cap.read()
+            if not ok:
+                break
+            t1 = time.perf_counter()
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            t2 = time.perf_counter()
+            if two_stage:
+                detections = be.detect_faces([frame], [gray])
+                t3 = time.perf_counter()
+                observation = be.classify_faces([gray], detections)[0]
+            else:
+                observation = be.observe(frame, gray)
+                t3 = time.perf_counter()
+            t4 = time.perf_counter()
+            result = engine._build_result(frame, gray, observation)
+            t5 = time.perf_counter()
+            annotated = render_annotations(frame, result)
+            t6 = time.perf_counter()
+            display.encode(annotated)
+            t7 = time.perf_counter()
+            if i < warmup:
+                continue
+            for stage, (a, b) in zip(STAGES, ((t0, t1), (t1, t2), (t2, t3), (t3, t4),
+                                              (t4, t5), (t5, t6), (t6, t7))):
+                timings[stage].append((b - a) * 1000.0)
+            totals.append((t7 - t0) * 1000.0)
+            found += result.faces_detected
+            if hall is not None:
+                visible += sum(hall.state_of(f, i) != HEAD_DOWN for f in range(n_faces))
+    finally:
+        cap.release()
+        be.close()
+
+    if not totals:
+        raise RuntimeError(f"Could not decode the video {path}")
+    source = f"{width}x{height}" if video is None else os.path.splitext(os.path.basename(video))[0]
+    return {
+        "name": f"{source}-{n_faces}f-{engine.backend_name}{'-tracking' if tracking else ''}",
+        "video": video,
+        "width": width, "height": height, "faces": n_faces, "backend": engine.backend_name,
+        "tracking": tracking, "frames": len(totals),
+        "fps": len(totals) / (sum(totals) / 1000.0),
+        "faces_per_frame": found / len(totals),
+        # Faces found per visible (not head-down) synthetic face — a sanity check for the
+        # Haar path, not an accuracy metric; None on real recordings
+        "recall": found / visible if visible else None,
+        "stages": {s: _percentiles(v) for s, v in timings.items()},
+        "total": _percentiles(totals),
+    }
+
+
+def run_suite(resolutions=RESOLUTIONS, face_counts=FACE_COUNTS, backends=("haar",), videos=None,
+              **kwargs) -> dict:
+    """Every backend on every resolution x face count, or on every recording in `videos` when given."""
+    scenarios = []
+    sources = [(v, 0, 0) for v in videos] if videos else [(None, w, h) for w, h in resolutions]
+    with tempfile.TemporaryDirectory(prefix="engagement-bench-") as workdir:
+        for backend in backends:
+            for video, w, h in sources:
+                for n in face_counts:
+                    r = run_scenario(w, h, n, backend=backend, workdir=workdir, video=video, **kwargs)
+                    print(f"  {r['name']:<28} {r['fps']:7.1f} fps   p50 {r['total']['p50_ms']:7.1f} ms"
+                          f"   p99 {r['total']['p99_ms']:7.1f} ms   {r['faces_per_frame']:5.1f} faces",
+                          file=sys.stderr)
+                    scenarios.append(r)
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(), "opencv": cv2.__version__, "numpy": np.__version__,
+            "platform": platform.platform(), "cpu_count": os.cpu_count(),
+            "opencv_threads": cv2.getNumThreads(), "settings": {k: v for k, v in kwargs.items()},
+        },
+        "scenarios": scenarios,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.15, min_ms: float = 0.5) -> list:
+    """Regressions of `current` against `baseline`, matched by scenario name.
+
+    A stage regresses when its p50 grew by more than `tolerance` (fraction) and by at
+    least `min_ms`, so sub-millisecond jitter is ignored; a scenario's fps regresses
+    when it fell by more than `tolerance`.
+    """
+    base = {s["name"]: s for s in baseline.get("scenarios", [])}
+    regressions = []
+    for s in current["scenarios"]:
+        b = base.get(s["name"])
+        if b is None:
+            continue
+        metrics = [(stage, b["stages"][stage]["p50_ms"], s["stages"][stage]["p50_ms"])
+                   for stage in STAGES if stage in b.get("stages", {})]
+        metrics.append(("total", b["total"]["p50_ms"], s["total"]["p50_ms"]))
+        for metric, old, new in metrics:
+            if new > old * (1 + tolerance) and new - old >= min_ms:
+                regressions.append({"scenario": s["name"], "metric": f"{metric} p50_ms",
+                                    "baseline": old, "current": new, "change": new / max(old, 1e-9) - 1})
+        if s["fps"] < b["fps"] * (1 - tolerance):
+            regressions.append({"scenario": s["name"], "metric": "fps", "baseline": b["fps"],
+                                "current": s["fps"], "change": s["fps"] / b["fps"] - 1})
+    return regressions
+
+
+def format_table(results: dict) -> str:
+    cols = ["fps", "faces/frame", "total"] + list(STAGES)
+    lines = [f"{'scenario':<28}" + "".join(f"{c:>15}" for c in cols),
+             f"{'':<28}" + f"{'':>30}" + "".join(f"{'p50 / p99 ms':>15}" for _ in cols[2:])]
+    for s in results["scenarios"]:
+        cells = [f"{s['fps']:15.1f}", f"{s.get('faces_per_frame', float('nan')):15.1f}"]
+        for c in cols[2:]:
+            m = s["total"] if c == "total" else s["stages"][c]
+            cells.append(f"{m['p50_ms']:7.2f} /{m['p99_ms']:6.1f}".rjust(15))
+        lines.append(f"{s['name']:<28}" + "".join(cells))
+    return "\n".join(lines)
+
+
+def _parse_resolutions(text: str) -> list:
+    out = []
+    for item in text.split(","):
+        w, _, h = item.strip().lower().partition("x")
+        out.append((int(w), int(h)))
+    return out
+
+
+def main(argv: list = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m engagement.benchmark",
+                                description="Benchmark the engagement engine on synthetic hall footage or recordings.")
+    p.add_argument("--resolutions", default=",".join(f"{w}x{h}" for w, h in RESOLUTIONS),
+                   help="comma-separated WxH list (default: %(default)s)")
+    p.add_argument("--faces", default=None,
+                   help="comma-separated student counts (default: %s; %d with --video, "
+                        "where it is the expected students)" % (",".join(map(str, FACE_COUNTS)), PROBE_FACES))
+    p.add_argument("--video", action="append", default=None, metavar="PATH",
+                   help="benchmark this recording instead of synthetic footage (repeatable); "
+                        "the way to compare detection counts across backends")
+    p.add_argument("--backends", default="haar",
+                   help=f"comma-separated backends from {', '.join(sorted(BACKENDS))} (default: haar)")
+    p.add_argument("--frames", type=int, default=60, help="timed frames per scenario (default: 60)")
+    p.add_argument("--warmup", type=int, default=5, help="untimed frames per scenario (default: 5)")
+    p.add_argument("--tracking", action="store_true", help="enable the face tracker")
+    p.add_argument("--detection-width", type=int, default=640, help="0 for full resolution (default: 640)")
+    p.add_argument("--threads", type=int, default=None, help="cv2.setNumThreads before running")
+    p.add_argument("--quick", action="store_true", help="640x480 and 1280x720 with 6 faces, 20 frames")
+    p.add_argument("-o", "--out", default=None, help="write results JSON here")
+    p.add_argument("--baseline", default=None, help="compare against this results JSON")
+    p.add_argument("--tolerance", type=float, default=0.15,
+                   help="allowed slowdown before flagging a regression (default: 0.15 = 15%%)")
+    args = p.parse_args(argv)
+
+    if args.threads is not None:
+        cv2.setNumThreads(args.threads)
+    resolutions = _parse_resolutions(args.resolutions)
+    if args.faces:
+        faces = [int(n) for n in args.faces.split(",")]
+    else:
+        faces = [PROBE_FACES] if args.video else list(FACE_COUNTS)
+    frames = args.frames
+    if args.quick:
+        resolutions, faces, frames = [(640, 480), (1280, 720)], [6], 20
+    backends = [b.strip() for b in args.backends.split(",")]
+    unknown = [b for b in backends if b not in BACKENDS or not BACKENDS[b].available()]
+    if unknown:
+        p.error(f"backend(s) not available: {', '.join(unknown)}")
+    missing = [v for v in args.video or () if not os.path.isfile(v)]
+    if missing:
+        p.error(f"no such file: {', '.join(missing)}")
+
+    print("Running benchmark…", file=sys.stderr)
+    results = run_suite(resolutions, faces, backends, videos=args.video, frames=frames, warmup=args.warmup,
+                        tracking=args.tracking, detection_width=args.detection_width or None)
+    print(format_table(results))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+        print(f"\nResults written to {args.out}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if not regressions:
+            print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+            return 0
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        for r in regressions:
+            print(f"  {r['scenario']:<28} {r['metric']:<22} {r['baseline']:9.2f} → {r['current']:9.2f}"
+                  f"  ({r['change']:+.0%})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
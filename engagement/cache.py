@@ -0,0 +1,257 @@
+"""
+Persistent upload-analysis cache.
+Completed upload timelines (ResultTable rows) stored as .npy files under a
+cache directory with a small SQLite index, keyed by video content hash,
+ENGINE_VERSION and the analysis settings, and evicted least-recently-used
+once the directory grows past a size limit. Runs in progress checkpoint
+their rows and decoder position under the same key so they can resume.
+"""
+
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+
+from engagement.engine import ENGINE_VERSION
+from engagement.regions import SeatMap
+from engagement.store import ResultTable, record_dtype
+
+DEFAULT_MAX_BYTES = 256 << 20
+CHECKPOINT_INTERVAL = 10.0          # seconds of analysis between checkpoints
+CHECKPOINT_TTL = 7 * 24 * 3600      # abandoned checkpoints are dropped after a week
+
+
+def _jsonable(obj):
+    if isinstance(obj, SeatMap):
+        return obj.seats
+    raise TypeError(f"Cannot use {type(obj).__name__} in a cache key")
+
+
+def cache_key(video_digest: str, settings: dict, engine_version: int = ENGINE_VERSION) -> str:
+    """Key for one recording analyzed with one set of settings (frame_skip, backend, engine kwargs …)."""
+    blob = json.dumps({"video": video_digest, "engine": engine_version, "settings": settings},
+                      sort_keys=True, default=_jsonable)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def default_cache_dir() -> str:
+    return os.environ.get("ENGAGEMENT_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "engagement")
+
+
+class ResultCache:
+    """Size-bounded LRU of ResultTables on disk, safe to share between threads and processes.
+
+    Each operation opens its own SQLite connection, so one instance can serve
+    every Streamlit session; entries are written atomically (temp file + rename).
+    """
+
+    def __init__(self, root: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root or default_cache_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+        self._db = os.path.join(self.root, "index.sqlite")
+        with self._connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, seats TEXT NOT NULL, "
+                       "size INTEGER NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)")
+            db.execute("CREATE TABLE IF NOT EXISTS checkpoints (key TEXT PRIMARY KEY, owner TEXT NOT NULL, "
+                       "seats TEXT NOT NULL, rows INTEGER NOT NULL, position INTEGER NOT NULL, "
+                       "total_frames INTEGER NOT NULL, updated REAL NOT NULL)")
+
+    @contextmanager
+    def _connect(self):
+        """Connection that commits on success (rolls back on error) and is always closed."""
+        db = sqlite3.connect(self._db, timeout=10)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.npy")
+
+    def _checkpoint_path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.rows")
+
+    def get(self, key: str):
+        """The cached ResultTable for key, or None; a hit marks the entry as recently used."""
+        with self._connect() as db:
+            row = db.execute("SELECT seats FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            try:
+                rows = np.load(self._path(key), allow_pickle=False)
+                table = ResultTable.from_numpy(rows, tuple(json.loads(row[0])))
+            except (OSError, ValueError):
+                db.execute("DELETE FROM entries WHERE key = ?", (key,))     # missing or unreadable file
+                return None
+            db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        return table
+
+    def put(self, key: str, table: ResultTable):
+        """Store table under key, then evict least-recently-used entries beyond max_bytes."""
+        buf = io.BytesIO()
+        np.save(buf, table.to_numpy(), allow_pickle=False)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(buf.getbuffer())
+        os.replace(tmp, self._path(key))
+        now = time.time()
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                       (key, json.dumps(table.seat_labels), buf.tell(), now, now))
+        self.drop_checkpoint(key)
+        self.evict()
+
+    def evict(self, max_bytes: int = None):
+        """Drop least-recently-used entries beyond max_bytes, and checkpoints abandoned for CHECKPOINT_TTL."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        with self._connect() as db:
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            for key, size in db.execute("SELECT key, size FROM entries ORDER BY last_used").fetchall():
+                if total <= limit:
+                    break
+                db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                try:
+                    os.unlink(self._path(key))
+                except OSError:
+                    pass
+                total -= size
+            stale = db.execute("SELECT key FROM checkpoints WHERE updated < ?",
+                               (time.time() - CHECKPOINT_TTL,)).fetchall()
+        for (key,) in stale:
+            self.drop_checkpoint(key)
+
+    def clear(self):
+        self.evict(0)
+        with self._connect() as db:
+            keys = db.execute("SELECT key FROM checkpoints").fetchall()
+        for (key,) in keys:
+            self.drop_checkpoint(key)
+
+    # ── Checkpoints of runs in progress ──
+    # Rows are appended to <key>.rows; the index row is the source of truth for how many
+    # of them are complete, and names the run (owner) allowed to write further.
+
+    def checkpoint(self, key: str, owner: str, table: ResultTable, position: int, total_frames: int = 0) -> bool:
+        """Save the rows of table not yet checkpointed and the 0-based decoder position to resume from.
+
+        Returns False, writing nothing, if another run has taken the checkpoint over.
+        """
+        if not len(table):
+            return True
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")       # serializes writers across sessions and processes
+            row = db.execute("SELECT owner, rows FROM checkpoints WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] != owner:
+                return False
+            done = row[1] if row is not None else 0
+            with open(self._checkpoint_path(key), "r+b" if row is not None else "wb") as f:
+                f.seek(done * table.dtype.itemsize)
+                f.write(table.to_numpy()[done:].tobytes())
+                f.truncate()
+            db.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       (key, owner, json.dumps(table.seat_labels), len(table), int(position),
+                        int(total_frames), time.time()))
+        return True
+
+    def checkpoint_info(self, key: str):
+        """{"rows", "position", "total_frames", "updated"} of the checkpoint under key, or None."""
+        with self._connect() as db:
+            row = db.execute("SELECT rows, position, total_frames, updated FROM checkpoints WHERE key = ?",
+                             (key,)).fetchone()
+        return None if row is None else dict(zip(("rows", "position", "total_frames", "updated"), row))
+
+    def load_checkpoint(self, key: str, owner: str = None):
+        """(ResultTable of the checkpointed rows, resume position), or None if there is no usable checkpoint.
+
+        With owner set the checkpoint is taken over: the run that wrote it can no
+        longer add to it, and owner continues from the returned position.
+        """
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT seats, rows, position FROM checkpoints WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            seats = tuple(json.loads(row[0]))
+            try:
+                rows = np.fromfile(self._checkpoint_path(key), dtype=record_dtype(seats), count=row[1])
+            except (OSError, ValueError):
+                rows = None
+            if rows is None or len(rows) != row[1]:
+                db.execute("DELETE FROM checkpoints WHERE key = ?", (key,))     # missing or truncated file
+                return None
+            if owner is not None:
+                db.execute("UPDATE checkpoints SET owner = ?, updated = ? WHERE key = ?", (owner, time.time(), key))
+        return ResultTable.from_numpy(rows, seats), row[2]
+
+    def drop_checkpoint(self, key: str):
+        with self._connect() as db:
+            db.execute("DELETE FROM checkpoints WHERE key = ?", (key,))
+        try:
+            os.unlink(self._checkpoint_path(key))
+        except OSError:
+            pass
+
+    def stats(self) -> dict:
+        with self._connect() as db:
+            n, size = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"entries": n, "bytes": size, "max_bytes": self.max_bytes}
+
+
+class Checkpointer:
+    """Periodic checkpoints of one analysis run, identified by a fresh owner token.
+
+    With cache=None every call is a no-op, so callers need not special-case
+    caching being switched off. Once another run resumes the same key, save()
+    returns False and this run should stop.
+    """
+
+    def __init__(self, cache: ResultCache, key: str, total_frames: int = 0,
+                 interval: float = CHECKPOINT_INTERVAL):
+        self.cache = cache
+        self.key = key
+        self.total_frames = total_frames
+        self.interval = interval
+        self.owner = uuid.uuid4().hex
+        self.superseded = False
+        self._last = time.monotonic()
+
+    def resume(self):
+        """(ResultTable analyzed so far, 0-based position to continue from); empty and 0 without a checkpoint."""
+        loaded = self.cache.load_checkpoint(self.key, owner=self.owner) if self.cache is not None else None
+        return loaded or (ResultTable(), 0)
+
+    def due(self) -> bool:
+        return (self.cache is not None and not self.superseded
+                and time.monotonic() - self._last >= self.interval)
+
+    def save(self, table: ResultTable, position: int) -> bool:
+        """Checkpoint table and position now; False if another run has taken the checkpoint over."""
+        if self.cache is not None and not self.superseded:
+            self.superseded = not self.cache.checkpoint(self.key, self.owner, table, position, self.total_frames)
+            self._last = time.monotonic()
+        return not self.superseded
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """The process-wide ResultCache (ENGAGEMENT_CACHE_DIR, ENGAGEMENT_CACHE_MB), created on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                mb = os.environ.get("ENGAGEMENT_CACHE_MB")
+                _cache = ResultCache(max_bytes=int(float(mb) * (1 << 20)) if mb else DEFAULT_MAX_BYTES)
+    return _cache
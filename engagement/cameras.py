@@ -0,0 +1,276 @@
+"""
+Local camera discovery and shared capture handles.
+Devices are probed once per process (until invalidate_cameras()), and each
+opened device — or network stream, see engagement.network — is read by a
+single background thread whose newest frame every session's pipeline
+subscribes to, so reruns and widget changes reuse the open handle instead
+of reopening the camera.
+"""
+
+import atexit
+import os
+import sys
+import threading
+import time
+
+import cv2
+
+PROBE_INDICES = (0, 1, 2)
+FRAME_TIMEOUT = 2.0         # seconds a reader waits for a new frame before reporting a capture failure
+IDLE_TIMEOUT = 60.0         # an unwatched device is closed after this long
+
+
+def _api() -> int:
+    return cv2.CAP_DSHOW if os.name == "nt" else cv2.CAP_V4L2
+
+
+def _probe(index: int) -> bool:
+    """True if device index opens and delivers a frame."""
+    old_stderr, devnull = sys.stderr, open(os.devnull, "w")
+    sys.stderr = devnull            # OpenCV's Python-side warnings while probing absent devices
+    try:
+        cap = cv2.VideoCapture(index, _api())
+        try:
+            return cap.isOpened() and cap.read()[0]
+        finally:
+            cap.release()
+    except Exception:
+        return False
+    finally:
+        sys.stderr = old_stderr
+        devnull.close()
+
+
+class FrameSource:
+    """A capture read by one background thread while anyone is subscribed.
+
+    Readers get the newest frame only, so a slow session never holds back the
+    source or other sessions. Subclasses implement _read_loop() with
+    _wait_for_subscribers(), _publish() and _fail(); with no subscribers the
+    source is closed after idle_timeout seconds.
+    """
+
+    frame_timeout = FRAME_TIMEOUT
+
+    def __init__(self, key, idle_timeout: float = IDLE_TIMEOUT):
+        self.key = key                  # registry key: device index or URL
+        self.idle_timeout = idle_timeout
+        self.error = None
+        self.props = {}                 # CAP_PROP_* values reported to readers
+        self._cond = threading.Condition()
+        self._frame = None
+        self._t_capture = 0.0
+        self._seq = 0
+        self._subscribers = 0
+        self._idle_since = time.monotonic()
+        self._closed = False
+        self._thread = None
+
+    def _start(self, name: str):
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def subscribe(self) -> "CameraReader":
+        with self._cond:
+            if self._closed:
+                raise OSError(f"Source {self.key} is closed")
+            self._subscribers += 1
+            self._cond.notify_all()
+            return CameraReader(self, self._seq)
+
+    def _unsubscribe(self):
+        with self._cond:
+            self._subscribers -= 1
+            if not self._subscribers:
+                self._idle_since = time.monotonic()
+            self._cond.notify_all()
+
+    def _wait_for_subscribers(self) -> bool:
+        """Block while nobody is subscribed; False once the source is closed (explicitly or when idle)."""
+        with self._cond:
+            while not self._subscribers and not self._closed:
+                idle = time.monotonic() - self._idle_since
+                if idle >= self.idle_timeout:
+                    self._closed = True
+                    break
+                self._cond.wait(timeout=self.idle_timeout - idle)
+            return not self._closed
+
+    def _publish(self, frame, t_capture: float):
+        with self._cond:
+            self._frame, self._t_capture = frame, t_capture
+            self._seq += 1
+            self._cond.notify_all()
+
+    def _fail(self, error: str):
+        with self._cond:
+            self.error = error
+            self._closed = True
+            self._cond.notify_all()
+
+    def _run(self):
+        try:
+            self._read_loop()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            _forget(self)
+
+    def _read_loop(self):
+        raise NotImplementedError
+
+    def close(self):
+        """Stop reading and release the capture (after any read in progress)."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class SharedCamera(FrameSource):
+    """A local device opened once (640x480 @ 15 fps requested) and shared by every reader."""
+
+    def __init__(self, index: int, width: int = 640, height: int = 480, fps: int = 15,
+                 idle_timeout: float = IDLE_TIMEOUT):
+        super().__init__(index, idle_timeout)
+        cap = cv2.VideoCapture(index, _api())
+        if not cap.isOpened():
+            cap.release()
+            raise OSError(f"Cannot open camera {index}")
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        cap.set(cv2.CAP_PROP_FPS, fps)
+        self.index = index
+        self.props = {prop: cap.get(prop) for prop in
+                      (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT, cv2.CAP_PROP_FPS)}
+        self._cap = cap
+        self._start(f"engagement-camera-{index}")
+
+    def _read_loop(self):
+        try:
+            while self._wait_for_subscribers():
+                ret, frame = self._cap.read()
+                if not ret:
+                    self._fail("Frame capture failed.")
+                    break
+                self._publish(frame, time.perf_counter())
+        finally:
+            self._cap.release()
+        if self.error:
+            invalidate_cameras()            # unplugged? probe again on the next discovery
+
+
+class CameraReader:
+    """One subscriber's view of a FrameSource.
+
+    Implements the grab() / retrieve() / read() / get() / isOpened() / release()
+    subset of cv2.VideoCapture used by the live pipelines; grab() waits for a
+    frame this reader has not seen yet, and release() only ends the subscription.
+    A grab() that times out while isOpened() is still true means the source is
+    only slow or reconnecting — callers may simply try again.
+    """
+
+    def __init__(self, source: FrameSource, seq: int):
+        self.source = source
+        self._seq = seq
+        self._frame = None
+        self._released = False
+
+    def grab(self, timeout: float = None) -> bool:
+        src = self.source
+        timeout = src.frame_timeout if timeout is None else timeout
+        with src._cond:
+            src._cond.wait_for(lambda: src._seq != self._seq or src._closed or self._released, timeout)
+            if src._seq == self._seq or self._released:
+                return False                # timed out, released, or the source failed / closed
+            self._seq, self._frame = src._seq, src._frame
+            return True
+
+    def retrieve(self):
+        return self._frame is not None, self._frame
+
+    def read(self):
+        return self.retrieve() if self.grab() else (False, None)
+
+    def get(self, prop: int) -> float:
+        return self.source.props.get(prop, 0.0)
+
+    def isOpened(self) -> bool:
+        return not self._released and not self.source.closed
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.source._unsubscribe()
+
+
+_sources = {}                       # device index or URL -> open FrameSource
+_discovered = None                  # probed device indices, None until the first discovery
+_lock = threading.Lock()
+
+
+def _forget(source: FrameSource):
+    with _lock:
+        if _sources.get(source.key) is source:
+            del _sources[source.key]
+
+
+def subscribe_source(key, factory) -> CameraReader:
+    """Subscribe to the open source registered under key, creating it with factory() if needed.
+
+    Raises OSError if the source cannot be opened.
+    """
+    with _lock:
+        source = _sources.get(key)
+        if source is None or source.closed:
+            source = _sources[key] = factory()
+    return source.subscribe()
+
+
+def discover_cameras(force: bool = False) -> list:
+    """Indices of working local cameras, probed once per process (again with force=True).
+
+    Devices this process already has open count as available without being reopened.
+    """
+    global _discovered
+    with _lock:
+        if _discovered is None or force:
+            _discovered = [i for i in PROBE_INDICES if i in _sources or _probe(i)]
+        return list(_discovered)
+
+
+def invalidate_cameras():
+    """Forget the discovery result so the next discover_cameras() probes again (e.g. after plugging a camera in)."""
+    global _discovered
+    with _lock:
+        _discovered = None
+
+
+def open_camera(index: int = None):
+    """A CameraReader on the first discovered camera (or on index), reusing an open handle; None if none works.
+
+    A device that fails to open invalidates the discovery cache.
+    """
+    candidates = [index] if index is not None else discover_cameras()
+    for i in candidates:
+        try:
+            return subscribe_source(i, lambda: SharedCamera(i))
+        except OSError:
+            continue                        # cannot open, or closed between lookup and subscribe
+    invalidate_cameras()
+    return None
+
+
+def close_sources():
+    """Close every open camera and stream (process exit)."""
+    with _lock:
+        sources = list(_sources.values())
+    for source in sources:
+        source.close()
+
+
+atexit.register(close_sources)
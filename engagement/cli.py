@@ -0,0 +1,167 @@
+"""
+Batch command line.
+Analyzes every recording in a directory on a shared process pool and writes
+one report folder per recording plus a cross-recording index, without
+Streamlit. Run as `python -m engagement RECORDINGS_DIR -o OUT_DIR`.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+
+from engagement.backends import BACKENDS
+from engagement.engine import resolve_backend
+from engagement.parallel import analyze_videos_parallel
+from engagement.regions import SeatMap
+from engagement.report import FORMATS, has_parquet_engine, write_report
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv")
+
+
+def sample_frame(recordings: list):
+    """First frame of the first recording that decodes, None if none does."""
+    for path in recordings:
+        cap = cv2.VideoCapture(path)
+        ret, frame = cap.read()
+        cap.release()
+        if ret:
+            return frame
+    return None
+
+
+def find_recordings(inputs: list, recursive: bool = False) -> list:
+    """Video files given directly or found in the given directories, sorted by path."""
+    found = []
+    for item in inputs:
+        if os.path.isfile(item):
+            found.append(item)
+            continue
+        if recursive:
+            walk = ((d, names) for d, _, names in os.walk(item))
+        else:
+            walk = [(item, os.listdir(item))]
+        for d, names in walk:
+            found.extend(os.path.join(d, n) for n in names if n.lower().endswith(VIDEO_EXTENSIONS))
+    return sorted(dict.fromkeys(os.path.abspath(p) for p in found))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="python -m engagement",
+        description="Analyze exam hall recordings headlessly and write engagement reports."
+    )
+    p.add_argument("inputs", nargs="+", help="recording files and/or directories of recordings")
+    p.add_argument("-o", "--out", required=True, help="output directory (one sub-folder per recording)")
+    p.add_argument("-f", "--format", choices=FORMATS, default="json", help="table format (default: json)")
+    p.add_argument("-r", "--recursive", action="store_true", help="search input directories recursively")
+    p.add_argument("-w", "--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    p.add_argument("--backend", choices=sorted(BACKENDS) + ["auto"], default="haar")
+    p.add_argument("--frame-skip", type=int, default=2, help="analyze every Nth frame (default: 2)")
+    p.add_argument("--sample-fps", type=float, default=None,
+                   help="analyze N frames per second of video instead of every Nth frame")
+    p.add_argument("--students", type=int, default=None,
+                   help="expected students in view; enables resolution-aware detection")
+    p.add_argument("--detection-width", type=int, default=640,
+                   help="downscale width for face detection, 0 for full resolution (default: 640)")
+    p.add_argument("--no-tracking", action="store_true", help="run full face detection on every frame")
+    p.add_argument("--detect-interval", type=int, default=10,
+                   help="full detection every K analyzed frames when tracking (default: 10)")
+    p.add_argument("--region-mask", action="store_true", help="learn where faces appear and scan only there")
+    p.add_argument("--motion-gate", action="store_true",
+                   help="reuse detections on unchanged frames and re-detect only changed regions")
+    p.add_argument("--seats", default=None,
+                   help="seat layout: ROWSxCOLS for a grid, or a JSON file of normalized seat ROIs")
+    return p
+
+
+def parse_seats(spec: str):
+    if not spec:
+        return None
+    if os.path.isfile(spec):
+        with open(spec, encoding="utf-8") as f:
+            return SeatMap.from_json(f.read())
+    rows, _, cols = spec.lower().partition("x")
+    return SeatMap.grid(int(rows), int(cols))
+
+
+def report_dir(out: str, path: str, common: str) -> str:
+    """Per-recording output folder mirroring the recording's path below the common input root."""
+    rel = os.path.relpath(path, common) if common else os.path.basename(path)
+    return os.path.join(out, os.path.splitext(rel)[0])
+
+
+def main(argv: list = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    missing = [i for i in args.inputs if not os.path.exists(i)]
+    if missing:
+        parser.error(f"no such file or directory: {', '.join(missing)}")
+    if args.format == "parquet" and not has_parquet_engine():
+        parser.error("--format parquet needs pyarrow (pip install pyarrow)")
+    try:
+        seat_map = parse_seats(args.seats)
+    except (ValueError, json.JSONDecodeError) as e:
+        parser.error(f"invalid --seats: {e}")
+
+    recordings = find_recordings(args.inputs, args.recursive)
+    if not recordings:
+        print("No recordings found.", file=sys.stderr)
+        return 1
+    common = os.path.commonpath([os.path.dirname(p) for p in recordings])
+
+    backend = args.backend
+    if backend == "auto":
+        # Probed once here, on real footage, instead of on synthetic frames in every worker
+        backend = resolve_backend("auto", args.students, sample_frame(recordings))
+        print(f"Backend: {backend}", file=sys.stderr)
+    engine_kwargs = {"tracking": not args.no_tracking, "detect_interval": args.detect_interval,
+                     "expected_faces": args.students, "detection_width": args.detection_width or None,
+                     "region_mask": args.region_mask, "seat_map": seat_map, "backend": backend,
+                     "motion_gate": args.motion_gate}
+    index = []
+    t0 = time.perf_counter()
+
+    def on_done(path, records):
+        n = len(index) + 1
+        name = os.path.relpath(path, common)
+        if not isinstance(records, Exception) and not records:
+            records = RuntimeError("no frames could be decoded")
+        if isinstance(records, Exception):
+            print(f"[{n}/{len(recordings)}] {name}: FAILED — {records}", file=sys.stderr)
+            index.append({"recording": name, "error": str(records)})
+            return
+        out_dir = report_dir(args.out, path, common)
+        try:
+            summary = write_report(records, out_dir, args.format, meta={"recording": name, "error": None})
+        except OSError as e:
+            # Disk full, permissions, a file in the way… — this recording fails, the batch goes on
+            print(f"[{n}/{len(recordings)}] {name}: FAILED writing report — {e}", file=sys.stderr)
+            index.append({"recording": name, "error": f"writing report: {e}"})
+            return
+        avg = "—" if summary["avg_score"] is None else f"{summary['avg_score']:.0f}%"
+        print(f"[{n}/{len(recordings)}] {name}: {summary['frames']} frames, avg {avg}, "
+              f"{summary['drop_frames']} drop frames", file=sys.stderr)
+        index.append(summary)
+
+    print(f"Analyzing {len(recordings)} recording(s)…", file=sys.stderr)
+    analyze_videos_parallel(recordings, frame_skip=args.frame_skip, workers=args.workers,
+                            sample_fps=args.sample_fps, engine_kwargs=engine_kwargs, done_cb=on_done)
+
+    import pandas as pd
+    index.sort(key=lambda r: r["recording"])
+    os.makedirs(args.out, exist_ok=True)
+    index_path = os.path.join(args.out, f"index.{args.format}")
+    if args.format == "parquet":
+        pd.DataFrame(index).to_parquet(index_path, index=False)
+    else:
+        with open(index_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=1, ensure_ascii=False)
+
+    failed = sum(1 for r in index if r.get("error"))
+    print(f"Done in {time.perf_counter() - t0:.1f}s — {len(index) - failed} ok, {failed} failed. "
+          f"Index: {index_path}", file=sys.stderr)
+    return 1 if failed else 0
@@ -0,0 +1,183 @@
+"""
+Process-wide detector pools.
+Haar cascades and the DNN face model are loaded once per process and shared by
+every session's EngagementEngine. Neither a CascadeClassifier nor a cv2.dnn Net
+is safe to call from two threads at once, so a pool hands out whole detector
+objects, creating new ones lazily only while every existing one is busy.
+"""
+
+import os
+import queue
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+
+class DetectorSet:
+    """One face + eye cascade pair. Use through DetectorPool.acquire()."""
+
+    __slots__ = ("face_cascade", "eye_cascade")
+
+    def __init__(self):
+        self.face_cascade = cv2.CascadeClassifier(
+            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+        )
+        self.eye_cascade = cv2.CascadeClassifier(
+            cv2.data.haarcascades + 'haarcascade_eye.xml'
+        )
+        if self.face_cascade.empty() or self.eye_cascade.empty():
+            raise RuntimeError("Haar cascade files could not be loaded")
+
+
+class DnnFaceDetector:
+    """CenterFace ONNX face detector run through cv2.dnn; detects faces in a batch of frames per call."""
+
+    MODEL_PATH = os.path.join(os.path.dirname(__file__), "models", "centerface.onnx")
+    OUTPUTS = ["537", "538", "539", "540"]     # heatmap, scale, offset, landmarks
+    MAX_NETS = 6
+
+    def __init__(self):
+        self._model = np.fromfile(self.MODEL_PATH, dtype=np.uint8)
+        # cv2.dnn returns corrupted outputs once a Net is reshaped to a different input
+        # size or batch, so every (width, height, batch) shape gets its own Net
+        self._nets = OrderedDict()
+        self._net_for(640, 352, 1)
+
+    def _net_for(self, in_w: int, in_h: int, batch: int):
+        key = (in_w, in_h, batch)
+        net = self._nets.get(key)
+        if net is None:
+            net = cv2.dnn.readNetFromONNX(self._model)
+            net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+            self._nets[key] = net
+            if len(self._nets) > self.MAX_NETS:
+                self._nets.popitem(last=False)
+        else:
+            self._nets.move_to_end(key)
+        return net
+
+    @staticmethod
+    def input_size(frame_w: int, frame_h: int, width: int = 640) -> tuple:
+        """Network input size for a frame: width-limited, aspect kept, both sides multiples of 32."""
+        width = min(width or frame_w, frame_w)
+        height = frame_h * width / frame_w
+        return int(np.ceil(width / 32) * 32), int(np.ceil(height / 32) * 32)
+
+    def detect(self, frames: list, width: int = 640, threshold: float = 0.5,
+               nms_threshold: float = 0.3) -> list:
+        """Face boxes (N, 4) x, y, w, h in original pixels for each frame; frames must share one size."""
+        fh, fw = frames[0].shape[:2]
+        in_w, in_h = self.input_size(fw, fh, width)
+        blob = cv2.dnn.blobFromImages(frames, 1.0, (in_w, in_h), (0, 0, 0), swapRB=False, crop=False)
+        net = self._net_for(in_w, in_h, len(frames))
+        net.setInput(blob)
+        heat, scale, offset, _ = net.forward(self.OUTPUTS)
+        sx, sy = fw / in_w, fh / in_h
+        out = []
+        for b in range(len(frames)):
+            ys, xs = np.where(heat[b, 0] > threshold)
+            if len(ys) == 0:
+                out.append(np.empty((0, 4), dtype=np.int32))
+                continue
+            bh = np.exp(np.minimum(scale[b, 0, ys, xs], 10)) * 4
+            bw = np.exp(np.minimum(scale[b, 1, ys, xs], 10)) * 4
+            x0 = np.clip((xs + offset[b, 1, ys, xs] + 0.5) * 4 - bw / 2, 0, in_w)
+            y0 = np.clip((ys + offset[b, 0, ys, xs] + 0.5) * 4 - bh / 2, 0, in_h)
+            bw = np.minimum(x0 + bw, in_w) - x0
+            bh = np.minimum(y0 + bh, in_h) - y0
+            scores = heat[b, 0, ys, xs]
+            boxes = np.stack([x0, y0, bw, bh], axis=1)
+            keep = cv2.dnn.NMSBoxes(boxes.tolist(), scores.tolist(), threshold, nms_threshold)
+            keep = np.asarray(keep, dtype=np.int64).reshape(-1)
+            boxes = boxes[keep] * np.array([sx, sy, sx, sy])
+            out.append(np.round(boxes).astype(np.int32))
+        return out
+
+
+class DetectorPool:
+    """Thread-safe pool of detector objects (DetectorSet by default), grown on demand up to max_size."""
+
+    def __init__(self, max_size: int = None, factory=DetectorSet):
+        self.factory = factory
+        self.max_size = max(1, max_size or os.cpu_count() or 1)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self.available = True
+        self.error = None
+        try:
+            # Load one set eagerly so a broken OpenCV install is reported up front
+            self._idle.put(self._new_set())
+        except Exception as e:
+            self.available = False
+            self.error = str(e)
+
+    def _new_set(self):
+        det = self.factory()
+        self._created += 1
+        return det
+
+    @property
+    def size(self) -> int:
+        return self._created
+
+    @contextmanager
+    def acquire(self, timeout: float = None):
+        """Borrow a detector for the duration of the with-block."""
+        try:
+            det = self._idle.get_nowait()
+        except queue.Empty:
+            det = None
+            with self._lock:
+                if self._created < self.max_size:
+                    det = self._new_set()
+            if det is None:
+                det = self._idle.get(timeout=timeout)
+        try:
+            yield det
+        finally:
+            self._idle.put(det)
+
+
+_shared_pool = None
+_dnn_pool = None
+_shared_lock = threading.Lock()
+
+
+def get_detector_pool() -> DetectorPool:
+    """The process-wide DetectorPool, created on first use."""
+    global _shared_pool
+    if _shared_pool is None:
+        with _shared_lock:
+            if _shared_pool is None:
+                _shared_pool = DetectorPool()
+    return _shared_pool
+
+
+def get_dnn_pool() -> DetectorPool:
+    """The process-wide pool of DnnFaceDetectors, created on first use."""
+    global _dnn_pool
+    if _dnn_pool is None:
+        with _shared_lock:
+            if _dnn_pool is None:
+                _dnn_pool = DetectorPool(factory=DnnFaceDetector)
+    return _dnn_pool
+
+
+def has_dnn_model() -> bool:
+    return os.path.isfile(DnnFaceDetector.MODEL_PATH) and hasattr(cv2, "dnn")
+
+
+@lru_cache(maxsize=1)
+def has_mediapipe() -> bool:
+    """True if mediapipe is importable (checked without importing it)."""
+    import importlib.util as _ilu
+    try:
+        return _ilu.find_spec("mediapipe") is not None
+    except Exception:
+        return False
@@ -0,0 +1,96 @@
+"""
+Display encoding for the dashboard video feed.
+Downscales BGR frames to the width they are shown at and JPEG-encodes them
+(st.image passes JPEG bytes through untouched), and paces the display rate
+so sending frames never takes more than a set share of wall time.
+Analysis always runs on the full-resolution frame.
+"""
+
+import time
+
+import cv2
+
+from engagement.metrics import METRICS
+
+
+def downscale(frame, max_width: int):
+    """Shrink frame to max_width (aspect kept) if wider.
+
+    Exact halvings use INTER_AREA's fast 2x2 averaging path; the final
+    sub-2x step is bilinear. General INTER_AREA at a fractional ratio is
+    several times slower for no visible gain at display size.
+    """
+    h, w = frame.shape[:2]
+    while w >= 2 * max_width:
+        frame = cv2.resize(frame, (w // 2, h // 2), interpolation=cv2.INTER_AREA)
+        h, w = frame.shape[:2]
+    if w > max_width:
+        frame = cv2.resize(frame, (max_width, max(1, round(h * max_width / w))), interpolation=cv2.INTER_LINEAR)
+    return frame
+
+
+class DisplayEncoder:
+    """Encode frames for st.image and decide when the next one may be sent.
+
+    max_width — displayed column width in pixels (None = no downscale)
+    quality — JPEG quality 1–100
+    max_fps — display rate cap
+    send_budget — fraction of wall time that encoding + sending may take; the
+    display rate drops when the link (or the browser) is slow to accept frames
+    """
+
+    def __init__(self, max_width: int = 800, quality: int = 75, max_fps: float = 15.0,
+                 send_budget: float = 0.5):
+        self.max_width = max_width
+        self.quality = int(quality)
+        self.max_fps = max_fps
+        self.send_budget = send_budget
+        self.send_s = 0.0               # EWMA of encode + send time
+        self.bytes_per_frame = 0.0      # EWMA of encoded size
+        self.sent = 0
+        self._last_sent = 0.0
+        self._fps_ewma = 0.0
+
+    def encode(self, frame) -> bytes:
+        """JPEG bytes of a BGR frame, downscaled to max_width if wider."""
+        timing = METRICS.enabled
+        t0 = time.perf_counter() if timing else 0.0
+        if self.max_width:
+            frame = downscale(frame, self.max_width)
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise RuntimeError("JPEG encoding failed")
+        if timing:
+            METRICS.since("display_encode", t0)
+        return buf.tobytes()
+
+    def interval(self) -> float:
+        """Minimum seconds between frames: the fps cap, or longer if sends are slow."""
+        floor = 1.0 / self.max_fps if self.max_fps else 0.0
+        return max(floor, self.send_s / self.send_budget if self.send_budget else 0.0)
+
+    def due(self) -> bool:
+        return time.perf_counter() - self._last_sent >= self.interval()
+
+    def show(self, placeholder, frame, force: bool = False) -> bool:
+        """Encode and send frame to an st.empty() placeholder if due (or forced); True if sent."""
+        now = time.perf_counter()
+        if not force and now - self._last_sent < self.interval():
+            return False
+        data = self.encode(frame)
+        placeholder.image(data, output_format="JPEG", use_container_width=True)
+        done = time.perf_counter()
+        if METRICS.enabled:
+            METRICS.since("display", now)
+        if self.sent:
+            gap = now - self._last_sent
+            self._fps_ewma = 0.8 * self._fps_ewma + 0.2 * (1.0 / gap if gap > 0 else 0.0)
+        self.send_s = done - now if not self.sent else 0.8 * self.send_s + 0.2 * (done - now)
+        self.bytes_per_frame = len(data) if not self.sent else 0.8 * self.bytes_per_frame + 0.2 * len(data)
+        self.sent += 1
+        self._last_sent = now
+        return True
+
+    def get_stats(self) -> dict:
+        return {"display_fps": self._fps_ewma, "display_kb": self.bytes_per_frame / 1024.0,
+                "send_ms": self.send_s * 1000.0}
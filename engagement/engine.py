@@ -0,0 +1,597 @@
+"""
+Engagement analysis engine.
+Face / engagement-cue detection via pluggable backends (Haar cascades,
+OpenCV DNN, MediaPipe FaceMesh), per-frame scoring and intervention rules.
+Importable without Streamlit so it can run inside worker processes.
+"""
+
+import cv2
+import numpy as np
+import time
+from collections import deque
+
+from engagement.backends import BACKENDS, DISTRACTED, ENGAGED, HEAD_DOWN, available_backends
+from engagement.detectors import DetectorPool, get_detector_pool, has_mediapipe
+from engagement.metrics import METRICS
+from engagement.motion import FULL, PARTIAL, REUSE, MotionGate
+from engagement.regions import DetectionRegionMask, SeatMap
+from engagement.results import FrameResult
+from engagement.stats import RollingStats
+from engagement.tracker import FaceTracker, iou_matrix
+
+# Bump whenever a change alters analysis output (detections, scores, counts) — invalidates cached results
+ENGINE_VERSION = 1
+
+# Native window of haarcascade_frontalface_default — nothing smaller can be detected
+CASCADE_WINDOW = 24
+
+
+def detection_params(frame_w: int, frame_h: int, expected_faces: int = None,
+                     detection_width: int = None) -> dict:
+    """Resolution-aware face-cascade parameters.
+
+    Face sizes are estimated from the frame area shared by the expected number
+    of students; the detection image is downscaled towards detection_width but
+    never so far that the smallest expected face drops below the cascade window.
+    Returns the detection scale and scaleFactor / minSize / maxSize in detection pixels.
+    """
+    if expected_faces is None:
+        # Legacy fixed parameters
+        min_face, max_face, scale_factor = 40.0, float(min(frame_w, frame_h)), 1.1
+    else:
+        n = max(1, int(expected_faces))
+        cell = (frame_w * frame_h / n) ** 0.5          # side of each student's share of the frame
+        min_face = max(20.0, 0.18 * cell)
+        max_face = float(min(frame_w, frame_h)) if n == 1 else min(float(min(frame_w, frame_h)), 1.5 * cell)
+        max_face = max(max_face, min_face * 1.5)
+        # ~24 pyramid levels between the smallest and largest expected face, never finer than the legacy 1.1
+        scale_factor = float(np.clip((max_face / min_face) ** (1 / 24), 1.1, 1.2))
+
+    scale = 1.0
+    if detection_width:
+        scale = min(1.0, max(detection_width / frame_w, CASCADE_WINDOW / min_face))
+
+    min_px = max(CASCADE_WINDOW, int(round(min_face * scale)))
+    max_px = max(min_px + 1, int(round(max_face * scale)))
+    return {"scale": scale, "scaleFactor": scale_factor,
+            "minSize": (min_px, min_px), "maxSize": (max_px, max_px)}
+
+
+def engagement_score(n_faces: int, head_down: int, distracted: int, eyes_visible: int) -> float:
+    """0–100 engagement score for a group of faces (see README for the formula)."""
+    score = 100.0
+    
+    n_faces = max(n_faces, 1)
+    # Penalize head-down students
+    score -= (head_down / n_faces) * 40
+    # Penalize distracted students  
+    score -= (distracted / n_faces) * 20
+    # Bonus for eye contact ratio
+    eye_ratio = min(eyes_visible / (n_faces * 2 + 0.001), 1.0)
+    score += (eye_ratio - 0.5) * 10
+    
+    return max(0.0, min(100.0, score))
+
+
+def _to_full(boxes, scale: float) -> list:
+    """Detection-image (x, y, w, h) boxes in full-resolution pixels."""
+    if scale >= 1.0:
+        return [tuple(int(v) for v in b) for b in boxes]
+    inv = 1.0 / scale
+    return [(int(bx * inv), int(by * inv), int(bw * inv), int(bh * inv)) for (bx, by, bw, bh) in boxes]
+
+
+def _overlaps_any(box, rects) -> bool:
+    x, y, w, h = box
+    return any(x < x1 and x0 < x + w and y < y1 and y0 < y + h for (x0, y0, x1, y1) in rects)
+
+
+def _dedupe(boxes: list, iou_threshold: float = 0.5) -> list:
+    """Drop boxes that overlap an earlier one — the same face found from two overlapping ROIs."""
+    keep = []
+    for b in boxes:
+        if not keep or iou_matrix(np.array([b]), np.array(keep)).max() < iou_threshold:
+            keep.append(b)
+    return keep
+
+
+class EngagementEngine:
+    """CPU-optimized engagement analysis engine using OpenCV + MediaPipe.
+
+    Holds only per-session state (history, tracks, region mask); detectors come
+    from a shared DetectorPool.
+    """
+    
+    def __init__(self, tracking: bool = False, detect_interval: int = 10,
+                 expected_faces: int = None, detection_width: int = None,
+                 region_mask: bool = False, seat_map: SeatMap = None,
+                 detectors: DetectorPool = None, backend: str = "haar", history_window: int = 150,
+                 motion_gate: bool = False):
+        # Cascades live in a process-wide pool shared by all sessions; the engine only holds per-session state
+        self.detectors = detectors if detectors is not None else get_detector_pool()
+        # MediaPipe is fully optional — only probed here, never loaded (libGL safe on Streamlit Cloud)
+        self.has_mediapipe = has_mediapipe()
+        
+        # Rolling window for temporal analysis
+        self.engagement_history = RollingStats(window=history_window)
+        self.silence_window = deque(maxlen=30)
+        self.blink_events = deque(maxlen=50)
+        self.last_movement_time = time.time()
+        self.frame_count = 0
+
+        # Between full-frame detections, faces are re-found in small windows around their tracks
+        self.tracker = FaceTracker(detect_interval=detect_interval) if tracking else None
+
+        # Faces are detected on a downscaled image; eyes are still checked at full resolution
+        self.expected_faces = expected_faces
+        self.detection_width = detection_width
+        self._det_params = {}
+
+        # Fixed cameras: learn where faces appear, or scan only the operator's seat ROIs
+        self.region_mask = DetectionRegionMask() if region_mask else None
+        self.seat_map = seat_map
+        self._scanned_fraction = 1.0
+
+        # Static halls: unchanged frames reuse the previous detections, changed regions are searched again
+        self.motion_gate = MotionGate() if motion_gate else None
+        self._gate_size = None
+        self._last_faces = None
+
+        self.backend = None
+        self.backend_name = None
+        self.set_backend(backend)
+        
+    def analyze_frame(self, frame: np.ndarray) -> FrameResult:
+        """Analyze a single frame for engagement cues."""
+        return self.analyze_frames([frame])[0]
+
+    def analyze_frames(self, frames: list) -> list:
+        """Analyze frames in order; batching backends run a single inference call for all of them."""
+        timing = METRICS.enabled
+        t0 = time.perf_counter() if timing else 0.0
+        grays = [cv2.cvtColor(f, cv2.COLOR_BGR2GRAY) for f in frames]
+        if timing:
+            METRICS.since("cvtColor", t0)
+            t0 = time.perf_counter()
+        gates = [None] * len(frames)
+        if self.backend is None:
+            observations = [None] * len(frames)
+        elif self.motion_gate is None:
+            observations = self.backend.observe_batch(frames, grays)
+        else:
+            observations, gates = self._observe_gated(frames, grays)
+        if timing:
+            METRICS.since("observe", t0)
+        results = []
+        for f, g, obs, gate in zip(frames, grays, observations, gates):
+            t0 = time.perf_counter() if timing else 0.0
+            results.append(self._build_result(f, g, obs, gate))
+            if timing:
+                METRICS.since("scoring", t0)
+        return results
+
+    def _observe_gated(self, frames: list, grays: list) -> tuple:
+        """Observations through the motion gate, one frame at a time, plus (mode, motion, searched fraction) each.
+
+        Unchanged frames reuse the previous faces. Changed regions are searched
+        again if the backend can observe sub-regions (faces elsewhere are kept);
+        otherwise, and on the gate's periodic refresh, the whole frame is analyzed.
+        """
+        gate = self.motion_gate
+        observations, gates = [], []
+        for frame, gray in zip(frames, grays):
+            h, w = gray.shape[:2]
+            if (w, h) != self._gate_size:
+                gate.reset()
+                self._gate_size, self._last_faces = (w, h), None
+            prev = self._last_faces or []
+            mode, rects = gate.plan(gray, [f["box"] for f in prev])
+            if gate.changed.any():
+                self.last_movement_time = time.time()
+            searched = 0.0
+            if mode == PARTIAL:
+                found = self.backend.observe_regions(frame, gray, rects)
+                if found is None:
+                    mode = FULL
+                else:
+                    obs = ([f for f in prev if not _overlaps_any(f["box"], rects)] + found, False)
+                    searched = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects) / float(w * h)
+            if mode == FULL:
+                obs = self.backend.observe_batch([frame], [gray])[0]
+                searched = None                 # whatever the full pass scanned
+            elif mode == REUSE:
+                obs = (prev, False)
+            gate.commit(mode, rects, w, h)
+            self._last_faces = obs[0]
+            observations.append(obs)
+            gates.append((mode, gate.motion, searched))
+        return observations, gates
+
+    @property
+    def batch_size(self) -> int:
+        """Frames per analyze_frames() call that the active backend can batch."""
+        return self.backend.batch_size if self.backend is not None else 1
+
+    def _build_result(self, frame: np.ndarray, gray: np.ndarray, observation, gate: tuple = None) -> FrameResult:
+        self.frame_count += 1
+        h, w = frame.shape[:2]
+        # Boxes and labels only — the annotated image is rendered lazily if the frame is shown
+        result = FrameResult(frame, time.time(), self.backend_name)
+        
+        if observation is None:
+            return result
+        
+        # ── Face detection ──
+        faces, full_pass = observation
+        result.faces_detected = len(faces)
+        result.track_ids = [f["track_id"] for f in faces if f["track_id"] is not None]
+        result.full_detection = full_pass
+        result.scanned_fraction = self._scanned_fraction if full_pass else 0.0
+        if gate is not None:
+            mode, result.motion, searched = gate
+            result.reused = mode == REUSE
+            if searched is not None:
+                result.scanned_fraction = searched
+        
+        distracted = 0
+        head_down = 0
+        eyes_visible = 0
+        
+        for face in faces:
+            result.face_boxes.append(face["box"])
+            result.face_states.append(face["state"])
+            result.face_ids.append(face["track_id"])
+            result.eye_boxes.extend(face["eyes"])
+            eyes_visible += face["eye_count"]
+            if face["state"] == HEAD_DOWN:
+                head_down += 1
+            elif face["state"] == DISTRACTED:
+                distracted += 1
+        
+        result.eyes_detected = eyes_visible
+        result.head_down_count = head_down
+        result.distracted_count = distracted
+        
+        # ── Engagement Score Calculation ──
+        score = engagement_score(result.faces_detected, head_down, distracted, eyes_visible)
+        result.engagement_score = score
+        
+        if self.seat_map is not None:
+            result.seats = self._seat_results(faces, w, h)
+            result.seat_rois = self.seat_map.rois(w, h)
+        
+        # ── Alerts ──
+        if head_down > 0:
+            result.alerts.append(f"⚠ {head_down} student(s) appear to have head down / not looking at paper")
+        if distracted > 0:
+            result.alerts.append(f"⚡ {distracted} student(s) showing signs of distraction")
+        if score < 50:
+            result.alerts.append("🔴 CRITICAL: Engagement dropped below 50%")
+        elif score < 70:
+            result.alerts.append("🟡 WARNING: Moderate engagement drop detected")
+        
+        self.engagement_history.push(score)
+        return result
+
+    def _seat_results(self, faces: list, w: int, h: int) -> list:
+        """Per-seat face count, state and score; empty seats get state EMPTY and score None."""
+        seat_idx = self.seat_map.assign([f["box"] for f in faces], w, h)
+        seats = []
+        for i, (label, _) in enumerate(self.seat_map.seats):
+            members = [j for j, s in enumerate(seat_idx) if s == i]
+            if not members:
+                seats.append({"seat": label, "faces": 0, "state": "EMPTY", "score": None})
+                continue
+            states = [faces[j]["state"] for j in members]
+            n_down, n_dist = states.count(HEAD_DOWN), states.count(DISTRACTED)
+            state = HEAD_DOWN if n_down else DISTRACTED if n_dist else ENGAGED
+            seats.append({"seat": label, "faces": len(members), "state": state,
+                          "score": engagement_score(len(members), n_down, n_dist,
+                                                    sum(faces[j]["eye_count"] for j in members))})
+        return seats
+
+    def set_backend(self, name: str = "haar", frame: np.ndarray = None):
+        """Switch detector backend: a name from BACKENDS, or "auto" for the fastest available one.
+
+        frame is an optional real sample for "auto" (see resolve_backend).
+        """
+        name = resolve_backend(name, self.expected_faces, frame)
+        if name == self.backend_name:
+            return
+        if self.backend is not None:
+            self.backend.close()
+        self.backend = BACKENDS[name](self) if name is not None else None
+        self.backend_name = name
+
+    def set_regions(self, region_mask: bool = False, seat_map: SeatMap = None):
+        """Enable/disable the learned region mask and set (or clear) the seat map."""
+        if not region_mask:
+            self.region_mask = None
+        elif self.region_mask is None:
+            self.region_mask = DetectionRegionMask()
+        self.seat_map = seat_map
+
+    def set_detection(self, expected_faces: int = None, detection_width: int = None):
+        """Update the face-size / detection-resolution settings used to derive cascade parameters."""
+        if (expected_faces, detection_width) != (self.expected_faces, self.detection_width):
+            self.expected_faces = expected_faces
+            self.detection_width = detection_width
+            self._det_params = {}
+
+    def _params_for(self, w: int, h: int) -> dict:
+        params = self._det_params.get((w, h))
+        if params is None:
+            params = detection_params(w, h, self.expected_faces, self.detection_width)
+            self._det_params[(w, h)] = params
+        return params
+
+    def _detection_image(self, gray: np.ndarray) -> tuple:
+        """(detection image, cascade params) — gray downscaled to the detection scale."""
+        h, w = gray.shape[:2]
+        p = self._params_for(w, h)
+        scale = p["scale"]
+        small = gray if scale >= 1.0 else cv2.resize(
+            gray, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA
+        )
+        return small, p
+
+    def _detect_faces(self, gray: np.ndarray, det):
+        """Return (boxes, track_ids, full_pass) in full-resolution pixels. Track IDs are empty when tracking is off."""
+        h, w = gray.shape[:2]
+        small, p = self._detection_image(gray)
+        scale = p["scale"]
+
+        if self.tracker is None or self.tracker.needs_full_detection():
+            boxes = _to_full(self._scan_regions(small, p, det), scale)
+            if self.region_mask is not None and self.seat_map is None:
+                self.region_mask.add(boxes, w, h)
+            if self.tracker is None:
+                return boxes, [], True
+            tracks = self.tracker.update(boxes, full=True)
+            full_pass = True
+        else:
+            sh, sw = small.shape[:2]
+            boxes = []
+            for tr in self.tracker.tracks:
+                x0, y0, x1, y1 = self.tracker.roi_for(tr, w, h)
+                x0, y0 = int(x0 * scale), int(y0 * scale)
+                x1, y1 = min(sw, int(x1 * scale) + 1), min(sh, int(y1 * scale) + 1)
+                tw, th = tr.box[2] * scale, tr.box[3] * scale
+                found = det.face_cascade.detectMultiScale(
+                    small[y0:y1, x0:x1], scaleFactor=p["scaleFactor"], minNeighbors=5,
+                    minSize=(max(CASCADE_WINDOW, int(tw * 0.75)), max(CASCADE_WINDOW, int(th * 0.75))),
+                    maxSize=(int(tw * 1.35) + 1, int(th * 1.35) + 1)
+                )
+                boxes.extend(_to_full([(fx + x0, fy + y0, fw, fh) for (fx, fy, fw, fh) in found], scale))
+            tracks = self.tracker.update(boxes, full=False)
+            full_pass = False
+
+        seen = [t for t in tracks if t.misses == 0]
+        return [t.box for t in seen], [t.track_id for t in seen], full_pass
+
+    def _scan_regions(self, small: np.ndarray, p: dict, det) -> list:
+        """Full detection pass on the detection image, limited to seat ROIs or the learned mask when set."""
+        sh, sw = small.shape[:2]
+        if self.seat_map is not None:
+            # Pad each seat so faces straddling a seat boundary are still found
+            rois = []
+            for (x0, y0, x1, y1) in self.seat_map.rois(sw, sh):
+                px, py = int((x1 - x0) * 0.1), int((y1 - y0) * 0.1)
+                rois.append((max(0, x0 - px), max(0, y0 - py), min(sw, x1 + px), min(sh, y1 + py)))
+        elif self.region_mask is not None and not self.region_mask.needs_full_scan():
+            rois = self.region_mask.rects(sw, sh)
+        else:
+            self._scanned_fraction = 1.0
+            return [tuple(b) for b in det.face_cascade.detectMultiScale(
+                small, scaleFactor=p["scaleFactor"], minNeighbors=5,
+                minSize=p["minSize"], maxSize=p["maxSize"]
+            )]
+
+        boxes, area = [], 0
+        min_w, min_h = p["minSize"]
+        for (x0, y0, x1, y1) in rois:
+            if x1 - x0 < min_w or y1 - y0 < min_h:
+                continue
+            area += (x1 - x0) * (y1 - y0)
+            found = det.face_cascade.detectMultiScale(
+                small[y0:y1, x0:x1], scaleFactor=p["scaleFactor"], minNeighbors=5,
+                minSize=p["minSize"], maxSize=p["maxSize"]
+            )
+            boxes.extend((fx + x0, fy + y0, fw, fh) for (fx, fy, fw, fh) in found)
+        self._scanned_fraction = area / float(sw * sh)
+        return _dedupe(boxes) if self.seat_map is not None else boxes
+
+    def _limit_to_regions(self, boxes: list, w: int, h: int) -> list:
+        """Full-frame detections limited to the seat ROIs or learned mask, as _scan_regions limits a scan.
+
+        For detectors that always see the whole frame (DNN): a box is kept if its
+        centre lies in a padded seat ROI or a mask region, and the mask learns
+        from what is kept, so both settings select the same faces as with Haar.
+        """
+        self._scanned_fraction = 1.0
+        if self.seat_map is not None:
+            rects = []
+            for (x0, y0, x1, y1) in self.seat_map.rois(w, h):
+                px, py = int((x1 - x0) * 0.1), int((y1 - y0) * 0.1)
+                rects.append((x0 - px, y0 - py, x1 + px, y1 + py))
+        elif self.region_mask is not None:
+            rects = None if self.region_mask.needs_full_scan() else self.region_mask.rects(w, h)
+        else:
+            return boxes
+        if rects is not None:
+            boxes = [b for b in boxes
+                     if any(x0 <= b[0] + b[2] / 2 < x1 and y0 <= b[1] + b[3] / 2 < y1 for (x0, y0, x1, y1) in rects)]
+        if self.region_mask is not None and self.seat_map is None:
+            self.region_mask.add(boxes, w, h)
+        return boxes
+
+    def _detect_in_rects(self, gray: np.ndarray, rects: list, det) -> list:
+        """Face boxes found inside full-resolution (x0, y0, x1, y1) rects, in full-resolution pixels."""
+        small, p = self._detection_image(gray)
+        scale = p["scale"]
+        sh, sw = small.shape[:2]
+        min_w, min_h = p["minSize"]
+        boxes = []
+        for (x0, y0, x1, y1) in rects:
+            x0, y0 = int(x0 * scale), int(y0 * scale)
+            x1, y1 = min(sw, int(np.ceil(x1 * scale))), min(sh, int(np.ceil(y1 * scale)))
+            if x1 - x0 < min_w or y1 - y0 < min_h:
+                continue
+            found = det.face_cascade.detectMultiScale(
+                small[y0:y1, x0:x1], scaleFactor=p["scaleFactor"], minNeighbors=5,
+                minSize=p["minSize"], maxSize=p["maxSize"]
+            )
+            boxes.extend((fx + x0, fy + y0, fw, fh) for (fx, fy, fw, fh) in found)
+        return _to_full(_dedupe(boxes), scale)
+
+    def reset_scene(self):
+        """Forget tracks, the learned region mask and motion-gate state, e.g. before analyzing a new recording."""
+        self.reset_tracking()
+        if self.region_mask is not None:
+            self.region_mask.reset()
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+            self._last_faces = None
+
+    def set_motion_gate(self, enabled: bool):
+        """Enable/disable motion-gated reuse of detections."""
+        if not enabled:
+            self.motion_gate = None
+        elif self.motion_gate is None:
+            self.motion_gate = MotionGate()
+            self._gate_size = self._last_faces = None
+
+    def set_tracking(self, enabled: bool, detect_interval: int = 10):
+        """Enable/disable the tracker; keeps existing tracks if only the interval changes."""
+        if not enabled:
+            self.tracker = None
+        elif self.tracker is None:
+            self.tracker = FaceTracker(detect_interval=detect_interval)
+        else:
+            self.tracker.detect_interval = max(1, int(detect_interval))
+
+    def reset_tracking(self):
+        """Forget all tracks, e.g. before analyzing a new recording."""
+        if self.tracker is not None:
+            self.tracker.reset()
+
+    def get_interventions(self, score: float, alerts: list) -> list:
+        """Generate actionable interventions based on engagement state."""
+        interventions = []
+        
+        if score < 40:
+            interventions += [
+                {"priority": "IMMEDIATE", "action": "Announce a 2-minute stretch break",
+                 "rationale": "Critical engagement drop — physical reset reactivates attention"},
+                {"priority": "IMMEDIATE", "action": "Walk through the exam hall slowly",
+                 "rationale": "Invigilator presence re-focuses distracted students"},
+                {"priority": "HIGH", "action": "Verbal reminder: 'Check your time remaining'",
+                 "rationale": "Time-pressure cue re-engages task focus"},
+            ]
+        elif score < 60:
+            interventions += [
+                {"priority": "HIGH", "action": "Gently tap on desks as you patrol",
+                 "rationale": "Low-stimulus alert for students showing fatigue signs"},
+                {"priority": "HIGH", "action": "Write remaining time on whiteboard",
+                 "rationale": "Visual time anchoring improves self-regulation"},
+                {"priority": "MEDIUM", "action": "Open/close a window for air circulation",
+                 "rationale": "Environmental refresh counters cognitive fatigue"},
+            ]
+        elif score < 75:
+            interventions += [
+                {"priority": "MEDIUM", "action": "Slow patrol of room perimeter",
+                 "rationale": "Passive supervision signal maintains focus"},
+                {"priority": "MEDIUM", "action": "Soft verbal: 'You have X minutes remaining'",
+                 "rationale": "Time reminder at mid-drop prevents further decline"},
+                {"priority": "LOW", "action": "Ensure water is accessible to students",
+                 "rationale": "Hydration supports sustained cognitive performance"},
+            ]
+        else:
+            interventions += [
+                {"priority": "LOW", "action": "Continue standard monitoring",
+                 "rationale": "Engagement is healthy — maintain current environment"},
+                {"priority": "LOW", "action": "Note time of high engagement for reporting",
+                 "rationale": "Baseline data helps identify optimal exam scheduling"},
+            ]
+        
+        # Specific alert-based interventions
+        for alert in alerts:
+            if "head down" in alert.lower():
+                interventions.insert(0, {
+                    "priority": "HIGH",
+                    "action": "Check on student(s) with head down — possible distress",
+                    "rationale": "Head-down posture can indicate anxiety, fatigue, or cheating"
+                })
+                break
+        
+        return interventions[:4]  # Max 4 interventions
+
+    def get_summary_stats(self) -> dict:
+        """Rolling statistics over the engagement history window — O(1), kept up to date in analyze_frame."""
+        hist = self.engagement_history
+        if not len(hist):
+            return {"avg": 0, "min": 0, "max": 0, "trend": "N/A", "drop_events": 0}
+        
+        # Trend: compare last 20 vs previous 20
+        diff = hist.trend_diff()
+        if diff is None:
+            trend = "→ Collecting..."
+        else:
+            trend = "↑ Rising" if diff > 3 else "↓ Falling" if diff < -3 else "→ Stable"
+        
+        return {"avg": hist.mean, "min": hist.min, "max": hist.max, "trend": trend,
+                "drop_events": hist.drop_events}
+
+
+# ─── Backend selection ────────────────────────────────────────────
+_probe_results = {}
+PROBE_FACES = 10            # expected students assumed by the probe when none are configured
+
+
+def probe_backends(frame: np.ndarray = None, runs: int = 8, expected_faces: int = None) -> dict:
+    """{backend: {"fps": analyze_frame throughput, "faces": faces found}} for each available backend.
+
+    Engines are built with expected_faces (PROBE_FACES if None), as the session
+    would use them. Without a sample frame a deterministic synthetic 640x480 hall
+    with six students is used; only the Haar cascade finds its drawn faces, so
+    its face counts say nothing about the other backends. Cached per sample
+    (synthetic, or a real frame's shape) and expected_faces.
+    """
+    key = (None if frame is None else frame.shape, expected_faces or PROBE_FACES)
+    if frame is None:
+        from engagement.synthetic import SyntheticHall
+        frame = SyntheticHall(640, 480, 6).frame(0)
+    if key not in _probe_results:
+        probe = {}
+        for name in available_backends():
+            try:
+                engine = EngagementEngine(backend=name, expected_faces=key[1])
+                faces = engine.analyze_frame(frame).faces_detected     # also the warm-up (graph init, first-call costs)
+                t0 = time.perf_counter()
+                for _ in range(runs):
+                    engine.analyze_frame(frame)
+                probe[name] = {"fps": runs / max(time.perf_counter() - t0, 1e-9), "faces": faces}
+                engine.backend.close()
+            except Exception:
+                continue
+        _probe_results[key] = probe
+    return {name: dict(r) for name, r in _probe_results[key].items()}
+
+
+def resolve_backend(name: str, expected_faces: int = None, frame: np.ndarray = None):
+    """Concrete backend name for a requested one, None if nothing works.
+
+    "auto" probes the backends and picks the fastest. Given a real sample frame
+    (e.g. the first camera or upload frame), backends that find no face on it are
+    passed over, unless none finds one.
+    """
+    if name == "auto":
+        probe = probe_backends(frame, expected_faces=expected_faces)
+        if frame is not None:
+            probe = {b: r for b, r in probe.items() if r["faces"] > 0} or probe
+        return max(probe, key=lambda b: probe[b]["fps"]) if probe else None
+    if name in BACKENDS and BACKENDS[name].available():
+        return name
+    # Requested backend missing (e.g. mediapipe not installed) — fall back to whatever works
+    avail = available_backends()
+    return "haar" if "haar" in avail else (avail[0] if avail else None)
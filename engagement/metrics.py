@@ -0,0 +1,147 @@
+"""
+Hot-path stage timing.
+A process-wide registry of per-stage duration histograms, fed by timing hooks
+in the engine, backends and the app's live / upload loops. Hooks check
+METRICS.enabled before reading the clock, so disabled timing costs one
+attribute test per stage.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+# Histogram bucket upper bounds in milliseconds (Prometheus export converts to seconds)
+BUCKETS_MS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0)
+_NULL = nullcontext()
+
+
+class StageHistogram:
+    """Cumulative bucket counts for export plus the most recent `window` samples for percentiles.
+
+    Updated from several threads without a lock; under the GIL a concurrent
+    update can at worst lose a single count, which is fine for monitoring.
+    """
+
+    __slots__ = ("buckets", "count", "sum_ms", "recent")
+
+    def __init__(self, window: int = 512):
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, ms: float):
+        self.buckets[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        self.recent.append(ms)
+
+    def summary(self) -> dict:
+        recent = np.fromiter(tuple(self.recent), dtype=np.float64)
+        if not len(recent):
+            return {"count": self.count, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+        p50, p95, p99 = np.percentile(recent, (50, 95, 99))
+        return {"count": self.count, "mean_ms": float(recent.mean()),
+                "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99)}
+
+
+class Metrics:
+    """Named stage histograms; disabled until enable() is called."""
+
+    def __init__(self, window: int = 512):
+        self.enabled = False
+        self.window = window
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._export = None
+
+    def enable(self, enabled: bool = True):
+        self.enabled = bool(enabled)
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+
+    def observe(self, stage: str, ms: float):
+        hist = self.stages.get(stage)
+        if hist is None:
+            with self._lock:
+                hist = self.stages.setdefault(stage, StageHistogram(self.window))
+        hist.observe(ms)
+
+    def since(self, stage: str, t0: float):
+        """Record the time elapsed since perf_counter() value t0."""
+        self.observe(stage, (time.perf_counter() - t0) * 1000.0)
+
+    def stage(self, name: str):
+        """Context manager timing its block as `name`; a shared no-op when disabled."""
+        return self._timed(name) if self.enabled else _NULL
+
+    @contextmanager
+    def _timed(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.since(name, t0)
+
+    def summary(self) -> dict:
+        """{stage: {count, mean_ms, p50_ms, p95_ms, p99_ms}} over each stage's recent window."""
+        return {name: h.summary() for name, h in sorted(self.stages.items())}
+
+    def prometheus_text(self, prefix: str = "engagement") -> str:
+        """All stages as one Prometheus text-format histogram, labelled by stage."""
+        name = f"{prefix}_stage_duration_seconds"
+        lines = [f"# HELP {name} Time spent in each pipeline stage.", f"# TYPE {name} histogram"]
+        for stage, h in sorted(self.stages.items()):
+            cumulative = 0
+            for le, n in zip(BUCKETS_MS + (None,), list(h.buckets)):
+                cumulative += n
+                le_s = "+Inf" if le is None else repr(le / 1000.0)
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{le_s}"}} {cumulative}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {h.sum_ms / 1000.0:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {cumulative}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Atomically replace `path` with the current metrics (for node_exporter's textfile collector)."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+    @property
+    def export_path(self):
+        """Path of the metrics file being written, None when not exporting."""
+        export = self._export
+        return export[0] if export is not None else None
+
+    def export_to(self, path: str = None, interval: float = 10.0):
+        """Write the metrics file every `interval` seconds from a daemon thread; path=None stops exporting."""
+        with self._lock:
+            if self._export is not None:
+                if self._export[0] == path:
+                    return
+                self._export[1].set()
+                self._export = None
+            if not path:
+                return
+            stop = threading.Event()
+            self._export = (path, stop)
+
+        def loop():
+            while not stop.wait(interval):
+                try:
+                    self.write_prometheus(path)
+                except OSError:
+                    pass                    # unwritable path — keep timing, retry next interval
+
+        threading.Thread(target=loop, name="engagement-metrics-export", daemon=True).start()
+
+
+METRICS = Metrics()
@@ -0,0 +1,145 @@
+"""
+MJPEG stand-in camera.
+Serves a video file (or synthetic hall footage) as an HTTP
+multipart/x-mixed-replace MJPEG stream, paced at the source frame rate, like
+an IP camera's /video endpoint. Used to try network sources without one.
+Run as `python -m engagement.mjpeg_server [VIDEO] --port 8081`.
+"""
+
+import argparse
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+from engagement.synthetic import SyntheticHall
+
+BOUNDARY = "frame"
+
+
+def encode_clip(path: str = None, quality: int = 80, synthetic_seconds: float = 10.0) -> tuple:
+    """([jpeg bytes], fps) for every frame of a video file, or a few seconds of synthetic footage without one."""
+    params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+    if path is None:
+        hall = SyntheticHall(640, 480, n_faces=6)
+        frames = hall.frames(int(synthetic_seconds * hall.fps))
+        fps = hall.fps
+    else:
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            raise OSError(f"Cannot open {path}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25
+        frames = _read_all(cap)
+    jpegs = [jpg.tobytes() for ok, jpg in (cv2.imencode(".jpg", f, params) for f in frames) if ok]
+    if not jpegs:
+        raise OSError(f"No frames in {path}")
+    return jpegs, fps
+
+
+def _read_all(cap):
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                return
+            yield frame
+    finally:
+        cap.release()
+
+
+class MJPEGServer(ThreadingHTTPServer):
+    """Every client of any path gets its own paced playback of the clip; stop with shutdown().
+
+    The clip is decoded and JPEG-encoded once up front, so serving costs no
+    decoding (and never contends with a client decoding in the same process).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple, path: str = None, quality: int = 80, loop: bool = True,
+                 max_frames: int = None):
+        self.jpegs, self.fps = encode_clip(path, quality)
+        self.loop = loop
+        self.max_frames = max_frames            # close each connection after this many frames (tests reconnects)
+        super().__init__(address, _MJPEGHandler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/video"
+
+    def start(self) -> "MJPEGServer":
+        """Serve from a daemon thread."""
+        threading.Thread(target=self.serve_forever, name="mjpeg-server", daemon=True).start()
+        return self
+
+    def parts(self):
+        """The JPEG frames one connection is sent, in order."""
+        n = 0
+        while True:
+            for jpg in self.jpegs:
+                if self.max_frames and n >= self.max_frames:
+                    return
+                n += 1
+                yield jpg
+            if not self.loop:
+                return
+
+
+class _MJPEGHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        self.send_response(200)
+        self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        interval = 1.0 / server.fps
+        next_due = time.perf_counter()
+        try:
+            for jpg in server.parts():
+                self.wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                                 f"Content-Length: {len(jpg)}\r\n\r\n".encode("ascii"))
+                self.wfile.write(jpg)
+                self.wfile.write(b"\r\n")
+                next_due += interval
+                delay = next_due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_due = time.perf_counter()      # slow client: don't burst to catch up
+        except (BrokenPipeError, ConnectionResetError):
+            pass                                        # client went away
+
+    def log_message(self, fmt, *args):
+        pass
+
+
+def main(argv: list = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m engagement.mjpeg_server",
+                                description="Serve a video file as an MJPEG stream (a stand-in IP camera).")
+    p.add_argument("video", nargs="?", default=None, help="video file (default: synthetic hall footage)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8081)
+    p.add_argument("--quality", type=int, default=80, help="JPEG quality (default: 80)")
+    p.add_argument("--once", action="store_true", help="end each stream at the end of the file instead of looping")
+    args = p.parse_args(argv)
+
+    try:
+        server = MJPEGServer((args.host, args.port), args.video, args.quality, loop=not args.once)
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    print(f"Streaming {args.video or 'synthetic footage'} at {server.url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
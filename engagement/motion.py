@@ -0,0 +1,98 @@
+"""
+Motion gating for fixed hall cameras.
+A coarse grid of cells is compared with the frame the current detections
+came from, on a small downscaled copy, so unchanged parts of a static hall
+can reuse their detections and only changed regions are searched again.
+"""
+
+import cv2
+import numpy as np
+
+from engagement.regions import merge_rects
+
+FULL, PARTIAL, REUSE = "full", "partial", "reuse"
+
+
+class MotionGate:
+    """Decides per analyzed frame whether detections can be reused, and where they cannot.
+
+    Each grid cell's mean absolute difference from the reference (the gray
+    frame the detections were made on, downscaled to 4x4 pixels per cell) is
+    compared with `threshold` gray levels. plan() returns REUSE when nothing
+    changed, PARTIAL with the changed regions (padded by `margin_cells`) when
+    they cover at most `max_partial` of the frame, and FULL otherwise, before
+    any detection exists, and on every `refresh_interval`-th analysis so
+    drift and missed faces are corrected.
+    """
+
+    def __init__(self, grid=(32, 18), threshold: float = 10.0, refresh_interval: int = 30,
+                 max_partial: float = 0.5, margin_cells: int = 1):
+        self.grid_w, self.grid_h = grid
+        self.threshold = threshold
+        self.refresh_interval = max(1, int(refresh_interval))
+        self.max_partial = max_partial
+        self.margin_cells = margin_cells
+        self.reset()
+
+    def reset(self):
+        self.reference = None             # downscaled gray frame the current detections belong to
+        self.since_full = 0               # analyses since the last full pass
+        self.changed = None               # bool (grid_h, grid_w) cells changed in the latest plan()
+        self._small = None
+
+    @property
+    def motion(self) -> float:
+        """Fraction of cells that changed in the latest plan()."""
+        return float(self.changed.mean()) if self.changed is not None else 1.0
+
+    def plan(self, gray: np.ndarray, face_boxes=()) -> tuple:
+        """(FULL | PARTIAL | REUSE, rects) for this frame; rects are full-resolution (x0, y0, x1, y1).
+
+        Regions touching a previous face box are grown to cover that box, so a
+        face that moved is searched for where it was as well as where it went.
+        """
+        h, w = gray.shape[:2]
+        small = cv2.resize(gray, (self.grid_w * 4, self.grid_h * 4), interpolation=cv2.INTER_AREA)
+        self._small = small
+        self.since_full += 1
+        if self.reference is None:
+            self.changed = np.ones((self.grid_h, self.grid_w), bool)
+            return FULL, []
+        diff = cv2.resize(cv2.absdiff(small, self.reference), (self.grid_w, self.grid_h),
+                          interpolation=cv2.INTER_AREA)
+        self.changed = diff > self.threshold
+        if self.since_full >= self.refresh_interval:
+            return FULL, []
+        if not self.changed.any():
+            return REUSE, []
+
+        mask = self.changed.astype(np.uint8)
+        if self.margin_cells:
+            k = 2 * self.margin_cells + 1
+            mask = cv2.dilate(mask, np.ones((k, k), np.uint8))
+        n, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        sx, sy = w / self.grid_w, h / self.grid_h
+        rects = [(int(x * sx), int(y * sy), min(w, int(np.ceil((x + cw) * sx))), min(h, int(np.ceil((y + ch) * sy))))
+                 for x, y, cw, ch, _ in stats[1:n]]
+        for (bx, by, bw, bh) in face_boxes:
+            pad_x, pad_y = bw // 4, bh // 4
+            box = (max(0, bx - pad_x), max(0, by - pad_y), min(w, bx + bw + pad_x), min(h, by + bh + pad_y))
+            for i, r in enumerate(rects):
+                if box[0] < r[2] and r[0] < box[2] and box[1] < r[3] and r[1] < box[3]:
+                    rects[i] = (min(r[0], box[0]), min(r[1], box[1]), max(r[2], box[2]), max(r[3], box[3]))
+        rects = merge_rects(rects)
+        if sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects) > self.max_partial * w * h:
+            return FULL, []
+        return PARTIAL, rects
+
+    def commit(self, mode: str, rects=(), frame_w: int = None, frame_h: int = None):
+        """Make the planned frame the reference where it was analyzed: everywhere after FULL, inside rects after PARTIAL."""
+        if mode == FULL:
+            self.reference = self._small
+            self.since_full = 0
+        elif mode == PARTIAL:
+            fx, fy = self._small.shape[1] / frame_w, self._small.shape[0] / frame_h
+            for (x0, y0, x1, y1) in rects:
+                sx0, sy0 = int(x0 * fx), int(y0 * fy)
+                sx1, sy1 = int(np.ceil(x1 * fx)), int(np.ceil(y1 * fy))
+                self.reference[sy0:sy1, sx0:sx1] = self._small[sy0:sy1, sx0:sx1]
@@ -0,0 +1,313 @@
+"""
+Multi-stream monitoring.
+Watches several camera, file or network sources at once: every stream has its own
+reader thread and EngagementEngine (so its own history), and all streams
+share one bounded pool of analysis workers that serves them round-robin,
+always on each stream's newest frame.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from engagement.cameras import CameraReader, open_camera
+from engagement.engine import EngagementEngine
+from engagement.metrics import METRICS
+from engagement.network import NetworkStream, is_network_source, open_stream
+from engagement.sampling import AdaptiveSampler
+from engagement.store import ResultRing
+
+
+def parse_sources(text: str) -> list:
+    """[(name, source)] from one source per line, optionally "Name = source".
+
+    A source is a camera index (int) or a file path / URL (str); unnamed
+    sources are called "Hall 1", "Hall 2", … Blank lines and #-comments are ignored.
+    """
+    sources = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        name, sep, src = line.partition("=")
+        if not sep or "://" in name:
+            name, src = "", line
+        name, src = name.strip(), src.strip()
+        sources.append((name or f"Hall {len(sources) + 1}", int(src) if src.isdigit() else src))
+    return sources
+
+
+def open_source(source):
+    """A capture for a camera index, RTSP / HTTP stream URL or file path.
+
+    Cameras and streams get shared handles (engagement.cameras); streams reconnect by themselves (engagement.network).
+    """
+    if isinstance(source, int):
+        cap = open_camera(source)
+        if cap is None:
+            raise OSError(f"Camera {source} is not available")
+        return cap
+    if is_network_source(source):
+        return open_stream(source)
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        cap.release()
+        raise OSError(f"Cannot open {source}")
+    return cap
+
+
+class AnalysisPool:
+    """A fixed number of analysis threads shared by any number of streams.
+
+    A stream with a fresh frame joins the back of one ready queue and is
+    analyzed by at most one worker at a time (its engine is stateful), so
+    every stream gets one turn per round however slow the others are, and
+    up to `workers` streams are analyzed in parallel (OpenCV releases the GIL).
+    """
+
+    def __init__(self, workers: int = None):
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self._cond = threading.Condition()
+        self._ready = deque()
+        self._threads = [threading.Thread(target=self._work, name=f"engagement-pool-{i}", daemon=True)
+                         for i in range(self.workers)]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, stream: "MonitoredStream"):
+        """Queue stream for a turn unless it is already queued or being analyzed."""
+        with self._cond:
+            if not stream._queued and not stream._busy:
+                stream._queued = True
+                self._ready.append(stream)
+                self._cond.notify()
+
+    def discard(self, stream: "MonitoredStream", timeout: float = None):
+        """Dequeue stream and wait (up to timeout) for an analysis of it in progress to finish."""
+        with self._cond:
+            if stream._queued:
+                self._ready.remove(stream)
+                stream._queued = False
+            self._cond.wait_for(lambda: not stream._busy, timeout)
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._ready:
+                    self._cond.wait()
+                stream = self._ready.popleft()
+                stream._queued, stream._busy = False, True
+            try:
+                stream._analyze_pending()
+            finally:
+                with self._cond:
+                    stream._busy = False
+                    if stream.has_pending() and not stream.stopped:
+                        stream._queued = True
+                        self._ready.append(stream)
+                    self._cond.notify_all()         # a worker for the requeued stream, and discard()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_analysis_pool() -> AnalysisPool:
+    """The process-wide AnalysisPool (ENGAGEMENT_ANALYSIS_WORKERS threads, default one per core)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = AnalysisPool(int(os.environ.get("ENGAGEMENT_ANALYSIS_WORKERS", 0)) or None)
+    return _pool
+
+
+class MonitoredStream:
+    """One source: a reader thread keeping the newest frame, analyzed by the shared pool.
+
+    File sources are paced at their own frame rate (and loop when `loop` is
+    set) so a recording stands in for a live camera. The newest result and a
+    ResultRing of scores are kept per stream; read them through latest and
+    history_tail(), which are safe to call from the UI thread. With an
+    AdaptiveSampler as `rate`, only frames it selects are handed to the pool.
+    """
+
+    def __init__(self, name: str, source, engine: EngagementEngine, pool: AnalysisPool,
+                 history: int = 300, loop: bool = True, rate: AdaptiveSampler = None):
+        self.name = name
+        self.source = source
+        self.engine = engine
+        self.pool = pool
+        self.loop = loop
+        self.rate = rate
+        self.status = "connecting"
+        self.error = None
+        self.latest = None              # {"frame_idx", "t_capture", "frame", "result", "stats"} of the newest analysis
+        self.captured = 0
+        self.analyzed = 0
+        self.dropped = 0                # frames replaced by a newer one before a worker got to them
+        self.latency_ms = deque(maxlen=60)
+        self.link = None                # the NetworkStream behind a stream URL, for its health stats
+        self._history = ResultRing(history)
+        self._lock = threading.Lock()
+        self._pending = None            # (frame_idx, t_capture, frame) not yet analyzed
+        self._queued = self._busy = False
+        self._stop = threading.Event()
+        self._done_at = deque(maxlen=30)    # completion times of the latest analyses, for the fps readout
+        self._thread = None
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._read_loop, name=f"engagement-stream-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 1.0):
+        """Stop reading and wait (up to timeout each) for the reader and an analysis in progress."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self.pool.discard(self, timeout)
+        if self.status in ("connecting", "live"):
+            self.status = "stopped"
+
+    def _read_loop(self):
+        try:
+            cap = open_source(self.source)
+        except OSError as e:
+            self.status, self.error = "error", str(e)
+            return
+        if isinstance(cap, CameraReader) and isinstance(cap.source, NetworkStream):
+            self.link = cap.source
+        paced = not isinstance(self.source, int) and "://" not in str(self.source)
+        interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 25) if paced else 0.0
+        if self.rate is not None and cap.get(cv2.CAP_PROP_FPS) > 0:
+            self.rate.max_fps = min(self.rate.max_fps, cap.get(cv2.CAP_PROP_FPS))
+        next_due = time.perf_counter()
+        frame_idx = 0
+        self.status = "live"
+        try:
+            while not self._stop.is_set():
+                if paced:
+                    delay = next_due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    next_due = max(next_due + interval, time.perf_counter() - interval)
+                ret, frame = cap.read()
+                if not ret and isinstance(cap, CameraReader) and cap.isOpened():
+                    continue            # shared source slow or reconnecting: wait for its next frame
+                if not ret and paced and self.loop and frame_idx:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    ret, frame = cap.read()
+                if not ret:
+                    self.status = "ended" if paced else "error"
+                    self.error = None if paced else "Frame capture failed."
+                    return
+                frame_idx += 1
+                self.captured += 1
+                t_capture = time.perf_counter()
+                if self.rate is not None and not self.rate.should_analyze(t_capture):
+                    continue
+                with self._lock:
+                    if self._pending is not None:
+                        self.dropped += 1
+                    self._pending = (frame_idx, t_capture, frame)
+                self.pool.submit(self)
+        finally:
+            cap.release()
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            return self._pending is not None
+
+    def _analyze_pending(self):
+        with self._lock:
+            item, self._pending = self._pending, None
+        if item is None or self._stop.is_set():
+            return
+        frame_idx, t_capture, frame = item
+        t0 = time.perf_counter()
+        try:
+            with METRICS.stage("stream_analyze"):
+                result = self.engine.analyze_frame(frame)
+            stats = self.engine.get_summary_stats()
+        except Exception as e:
+            self.status, self.error = "error", f"Analysis failed: {e}"
+            self._stop.set()
+            return
+        with self._lock:
+            self._history.append(frame_idx, result["timestamp"], result)
+            self.latest = {"frame_idx": frame_idx, "t_capture": t_capture, "frame": frame,
+                           "result": result, "stats": stats}
+            self.analyzed += 1
+            now = time.perf_counter()
+            self.latency_ms.append((now - t_capture) * 1000.0)
+            self._done_at.append(now)
+        if self.rate is not None:
+            self.rate.record(now - t0, now - t_capture, now)
+
+    def history_tail(self, n: int = 100) -> np.ndarray:
+        """Copy of the newest n history rows (frame, time_s, score, …)."""
+        with self._lock:
+            return self._history.tail(n).copy()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lat = list(self.latency_ms)
+            span = self._done_at[-1] - self._done_at[0] if len(self._done_at) > 1 else 0.0
+            return {
+                "captured": self.captured,
+                "analyzed": self.analyzed,
+                "dropped": self.dropped,
+                "analysis_fps": (len(self._done_at) - 1) / span if span > 0 else 0.0,
+                "latency_ms": float(np.mean(lat)) if lat else 0.0,
+                "link": self.link.get_stats() if self.link is not None else None,
+                "rate": self.rate.get_stats() if self.rate is not None else None,
+            }
+
+
+class MultiStreamMonitor:
+    """A set of MonitoredStreams, each with its own EngagementEngine, on one AnalysisPool.
+
+    With rate_kwargs, every stream gets its own AdaptiveSampler(**rate_kwargs), so a
+    CPU or latency budget applies per stream.
+    """
+
+    def __init__(self, sources: list, engine_kwargs: dict = None, pool: AnalysisPool = None,
+                 loop: bool = True, rate_kwargs: dict = None):
+        self.pool = pool or get_analysis_pool()
+        self.streams = [MonitoredStream(name, src, EngagementEngine(**(engine_kwargs or {})), self.pool, loop=loop,
+                                        rate=AdaptiveSampler(**rate_kwargs) if rate_kwargs else None)
+                        for name, src in sources]
+
+    def start(self):
+        for s in self.streams:
+            s.start()
+        return self
+
+    def stop(self):
+        for s in self.streams:
+            s._stop.set()               # signal every reader first, then wait for each
+        for s in self.streams:
+            s.stop()
+
+    @property
+    def running(self) -> bool:
+        return any(s.status in ("connecting", "live") for s in self.streams)
+
+    def summary(self) -> dict:
+        """Hall count, mean of the latest hall scores, and the lowest-scoring hall."""
+        scores = [(s.latest["result"]["engagement_score"], s) for s in self.streams if s.latest is not None]
+        if not scores:
+            return {"halls": len(self.streams), "reporting": 0, "avg": None, "worst": None}
+        worst = min(scores, key=lambda x: x[0])[1]
+        return {"halls": len(self.streams), "reporting": len(scores),
+                "avg": float(np.mean([sc for sc, _ in scores])), "worst": worst}
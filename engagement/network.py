@@ -0,0 +1,144 @@
+"""
+Network camera streams.
+RTSP and HTTP(S) MJPEG sources, each read by one background thread per URL
+that decodes continuously and keeps only the newest frame (a decoder backlog
+never turns into display latency), reconnects with exponential backoff, and
+tracks health and latency stats. Readers are shared like local cameras.
+"""
+
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from engagement.cameras import IDLE_TIMEOUT, FrameSource, subscribe_source
+
+NETWORK_SCHEMES = ("rtsp://", "rtsps://", "http://", "https://")
+OPEN_TIMEOUT_MS = 5000
+READ_TIMEOUT_MS = 5000
+
+
+def is_network_source(source) -> bool:
+    return isinstance(source, str) and source.lower().startswith(NETWORK_SCHEMES)
+
+
+def redact(url: str) -> str:
+    """url without its user:password part, for display and logs.
+
+    Everything up to the last "@" goes, so a password containing "@", "/" or ":"
+    never shows; a URL with an "@" in its path or query loses the part before it too.
+    """
+    scheme, sep, rest = url.partition("://")
+    _, at, tail = rest.rpartition("@")
+    return f"{scheme}{sep}{tail}" if sep and at else url
+
+
+class NetworkStream(FrameSource):
+    """A network source that keeps trying: connect, read until the stream drops, wait, reconnect.
+
+    The wait after a failed attempt doubles from backoff_initial up to
+    backoff_max and resets after the next frame. Readers see isOpened() true
+    throughout, so a grab() that times out during an outage can just be retried.
+    """
+
+    frame_timeout = 1.0
+
+    def __init__(self, url: str, backoff_initial: float = 0.5, backoff_max: float = 30.0,
+                 idle_timeout: float = IDLE_TIMEOUT):
+        super().__init__(url, idle_timeout)
+        self.url = url
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.status = "connecting"      # connecting → live ⇄ reconnecting; closed when idle or closed
+        self.last_error = None
+        self.connects = 0
+        self.failed_attempts = 0
+        self.frames = 0
+        self.connect_ms = 0.0
+        self._connected_at = None
+        self._read_ms = deque(maxlen=60)
+        self._arrivals = deque(maxlen=60)
+        self._start("engagement-stream-" + redact(url))
+
+    @property
+    def reconnects(self) -> int:
+        return max(0, self.connects - 1)
+
+    def _open(self):
+        params = [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, OPEN_TIMEOUT_MS, cv2.CAP_PROP_READ_TIMEOUT_MSEC, READ_TIMEOUT_MS]
+        return cv2.VideoCapture(self.url, cv2.CAP_FFMPEG, params)
+
+    def _backoff(self, delay: float) -> bool:
+        """Wait delay seconds (or until closed); True if the source should keep trying."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._closed, delay)
+            return not self._closed
+
+    def _read_loop(self):
+        delay = self.backoff_initial
+        while self._wait_for_subscribers():
+            t0 = time.perf_counter()
+            cap = self._open()
+            if not cap.isOpened():
+                cap.release()
+                self.failed_attempts += 1
+                self.last_error = f"Cannot connect to {redact(self.url)}"
+                if not self._backoff(delay):
+                    break
+                delay = min(delay * 2, self.backoff_max)
+                continue
+            self.connects += 1
+            self.connect_ms = (time.perf_counter() - t0) * 1000.0
+            self.props = {prop: cap.get(prop) for prop in
+                          (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT, cv2.CAP_PROP_FPS)}
+            self._connected_at = time.monotonic()
+            self.status = "live"
+            try:
+                while self._wait_for_subscribers():
+                    t_read = time.perf_counter()
+                    ret, frame = cap.read()
+                    if not ret:
+                        break
+                    now = time.perf_counter()
+                    self._publish(frame, now)
+                    self.frames += 1
+                    self._read_ms.append((now - t_read) * 1000.0)
+                    self._arrivals.append(now)
+                    delay = self.backoff_initial
+            finally:
+                cap.release()
+            if self._closed:
+                break
+            self.last_error = f"Stream from {redact(self.url)} dropped"
+            self.status = "reconnecting"
+            self._connected_at = None
+            if not self._backoff(delay):
+                break
+            delay = min(delay * 2, self.backoff_max)
+        self.status = "closed"
+
+    def get_stats(self) -> dict:
+        """Health (status, uptime, reconnects, last error) and timing of the stream."""
+        arrivals, read_ms = list(self._arrivals), list(self._read_ms)
+        span = arrivals[-1] - arrivals[0] if len(arrivals) > 1 else 0.0
+        gaps = np.diff(arrivals) * 1000.0 if len(arrivals) > 1 else np.zeros(0)
+        return {
+            "status": self.status,
+            "uptime_s": time.monotonic() - self._connected_at if self._connected_at is not None else 0.0,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "failed_attempts": self.failed_attempts,
+            "last_error": self.last_error,
+            "frames": self.frames,
+            "fps": (len(arrivals) - 1) / span if span > 0 else 0.0,
+            "frame_age_ms": (time.perf_counter() - arrivals[-1]) * 1000.0 if arrivals else None,
+            "read_ms": float(np.mean(read_ms)) if read_ms else 0.0,     # wait + demux + decode per frame
+            "jitter_ms": float(np.std(gaps)) if len(gaps) else 0.0,
+            "connect_ms": self.connect_ms,
+        }
+
+
+def open_stream(url: str):
+    """A CameraReader on the shared NetworkStream for url (started on first use)."""
+    return subscribe_source(url, lambda: NetworkStream(url))
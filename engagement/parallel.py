@@ -0,0 +1,172 @@
+"""
+Parallel upload analysis.
+Splits recordings into frame-range chunks, analyzes each chunk in a worker
+process with its own EngagementEngine, and merges the results back into one
+ordered timeline per recording, identical to the sequential upload loop.
+"""
+
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+from engagement.engine import EngagementEngine
+from engagement.sampling import FrameSampler, iter_batches, iter_sampled_frames, open_video_at
+from engagement.store import ResultTable
+
+_worker_engine = None
+
+
+def plan_chunks(total_frames: int, workers: int, min_chunk: int = 250) -> list:
+    """Split [0, total_frames) into contiguous (start, end) ranges; the last range is open-ended (end=None)."""
+    if total_frames <= 0:
+        return [(0, None)]
+    # A few chunks per worker keeps the pool busy when some chunks decode slower than others
+    n_chunks = max(1, min(workers * 4, total_frames // min_chunk))
+    size = -(-total_frames // n_chunks)
+    chunks = [(s, s + size) for s in range(0, total_frames, size)]
+    chunks[-1] = (chunks[-1][0], None)   # frame count is a container hint — read to EOF
+    return chunks
+
+
+def chunkable(engine_kwargs: dict = None) -> bool:
+    """True if a recording can be split into independently analyzed chunks.
+
+    The tracker (tracks and its detect-every-K schedule), a learned region mask
+    and the motion gate carry state from frame to frame, so with any of them on
+    each recording is analyzed as one chunk to match the sequential run.
+    """
+    kw = engine_kwargs or {}
+    learned_mask = kw.get("region_mask") and kw.get("seat_map") is None
+    return not (kw.get("tracking") or learned_mask or kw.get("motion_gate"))
+
+
+def _init_worker(engine_kwargs: dict):
+    global _worker_engine
+    # One OpenCV thread per process — the pool already provides the parallelism
+    cv2.setNumThreads(1)
+    _worker_engine = EngagementEngine(**engine_kwargs)
+
+
+def _analyze_chunk(path: str, start: int, end, frame_skip: int, sample_fps, fps: float) -> ResultTable:
+    # Chunks of different recordings share workers — never carry tracks or a learned mask across
+    _worker_engine.reset_scene()
+    cap = open_video_at(path, start)
+    sampler = FrameSampler(frame_skip, sample_fps, fps)
+    records = ResultTable()
+    try:
+        frames = iter_sampled_frames(cap, sampler, start, end)
+        for batch in iter_batches(frames, _worker_engine.batch_size):
+            results = _worker_engine.analyze_frames([frame for _, frame in batch])
+            for (frame_idx, _), result in zip(batch, results):
+                records.append(frame_idx, frame_idx / fps, result)
+    finally:
+        cap.release()
+    return records
+
+
+def analyze_video_parallel(path: str, frame_skip: int = 1, workers: int = None,
+                           progress_cb=None, sample_fps: float = None,
+                           engine_kwargs: dict = None, start_frame: int = 0,
+                           chunk_cb=None) -> ResultTable:
+    """Analyze a video file across a process pool and return the merged, frame-ordered ResultTable.
+
+    progress_cb, if given, is called with the completed fraction (0–1) after each chunk.
+    sample_fps switches from every-Nth-frame to time-based sampling (see FrameSampler).
+    engine_kwargs are passed to each worker's EngagementEngine. Results are identical
+    to the sequential run: settings that carry state between frames (see chunkable())
+    keep the recording in one chunk, and thus in one worker.
+    start_frame resumes a checkpointed run: only frames from that 0-based position
+    on are analyzed. chunk_cb(records, end) receives each chunk in frame order as
+    soon as every chunk before it is done; end is the position after it (None for the last).
+    If chunk_cb returns False the run stops and the chunks merged so far are returned.
+    """
+    on_chunk = (lambda _path, records, end: chunk_cb(records, end)) if chunk_cb else None
+    results = analyze_videos_parallel([path], frame_skip, workers, progress_cb, sample_fps, engine_kwargs,
+                                      start_frames={path: start_frame}, chunk_cb=on_chunk)
+    records = results[path]
+    if isinstance(records, Exception):
+        raise records
+    return records
+
+
+def analyze_videos_parallel(paths: list, frame_skip: int = 1, workers: int = None,
+                            progress_cb=None, sample_fps: float = None,
+                            engine_kwargs: dict = None, done_cb=None, start_frames: dict = None,
+                            chunk_cb=None) -> dict:
+    """Analyze several recordings on one shared process pool; returns {path: ResultTable}.
+
+    Chunks of all recordings are queued together so a long recording does not leave
+    workers idle; when chunkable(engine_kwargs) is false each recording is one chunk.
+    A recording whose chunk fails maps to the exception instead of a ResultTable, and
+    done_cb(path, records_or_exception) is called as each recording finishes.
+    start_frames ({path: 0-based position}) skips already analyzed frames, and
+    chunk_cb(path, records, end) sees each recording's chunks in frame order; if it
+    returns False, chunks not yet started are cancelled and every unfinished
+    recording maps to the chunks merged so far, without a done_cb call.
+    """
+    workers = workers or os.cpu_count() or 1
+    frame_skip = max(1, int(frame_skip))
+    paths = list(dict.fromkeys(paths))
+    if not paths:
+        return {}
+
+    split = chunkable(engine_kwargs)
+    jobs = []
+    for path in paths:
+        cap = cv2.VideoCapture(path)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25
+        cap.release()
+        first = (start_frames or {}).get(path, 0)
+        jobs.extend((path, first + s, e if e is None else first + e, fps)
+                    for s, e in (plan_chunks(total_frames - first, workers) if split else [(0, None)]))
+
+    parts = {path: {} for path in paths}
+    order = {path: [] for path in paths}   # (start, end) of chunks not yet merged, in frame order
+    for path, s, e, _ in jobs:
+        order[path].append((s, e))
+    merged = {path: ResultTable() for path in paths}
+    results = {}
+
+    def finish(path, value):
+        results[path] = value
+        if done_cb:
+            done_cb(path, value)
+
+    # spawn, not fork: the Streamlit server process is heavily threaded
+    ctx = mp.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=ctx,
+                             initializer=_init_worker, initargs=(engine_kwargs or {},)) as pool:
+        futures = {pool.submit(_analyze_chunk, path, s, e, frame_skip, sample_fps, fps): (path, s)
+                   for path, s, e, fps in jobs}
+        stopped = False
+        for done, fut in enumerate(as_completed(futures), 1):
+            path, start = futures[fut]
+            if progress_cb:
+                progress_cb(done / len(jobs))
+            if path in results:
+                continue                          # recording already failed on another chunk
+            try:
+                parts[path][start] = fut.result()
+            except Exception as e:
+                parts[path].clear()
+                finish(path, e)
+                continue
+            # Merge every chunk whose predecessors are all done
+            while order[path] and order[path][0][0] in parts[path]:
+                s, e = order[path].pop(0)
+                records = parts[path].pop(s)
+                merged[path].extend(records)
+                if chunk_cb and chunk_cb(path, records, e) is False:
+                    stopped = True
+                    break
+            if stopped:
+                # Running chunks still finish (a worker cannot be interrupted), queued ones never start
+                for f in futures:
+                    f.cancel()
+                break
+            if not order[path]:
+                finish(path, merged.pop(path))
+    return {path: results[path] if path in results else merged[path] for path in paths}
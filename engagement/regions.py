@@ -0,0 +1,166 @@
+"""
+Detection regions for fixed hall cameras.
+A learned heatmap of where faces appear restricts routine detection to the
+occupied part of the frame, and an optional manual seat map runs detection
+per seat ROI and reports engagement per seat.
+"""
+
+import json
+import math
+from numbers import Real
+
+import cv2
+import numpy as np
+
+
+def merge_rects(rects: list) -> list:
+    """Merge overlapping (x0, y0, x1, y1) rects until none overlap, so no pixel is scanned twice."""
+    rects = [list(r) for r in rects]
+    merged = True
+    while merged:
+        merged = False
+        out = []
+        while rects:
+            a = rects.pop()
+            i = 0
+            while i < len(rects):
+                b = rects[i]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    a = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    rects.pop(i)
+                    merged = True
+                else:
+                    i += 1
+            out.append(a)
+        rects = out
+    return [tuple(r) for r in rects]
+
+
+class DetectionRegionMask:
+    """Heatmap of face detections on a coarse grid over the (fixed) camera view.
+
+    After `warmup` detection passes, cells hit at least `min_hits` times (dilated
+    by `margin_cells`) form the mask, and routine full detections only scan the
+    bounding rects of its connected regions. Every `rescan_interval`-th pass
+    still scans the whole frame so students in new places are picked up.
+    """
+
+    def __init__(self, grid=(64, 36), warmup: int = 5, rescan_interval: int = 10,
+                 min_hits: int = 2, margin_cells: int = 2):
+        self.grid_w, self.grid_h = grid
+        self.warmup = warmup
+        self.rescan_interval = max(1, int(rescan_interval))
+        self.min_hits = min_hits
+        self.margin_cells = margin_cells
+        self.reset()
+
+    def reset(self):
+        self.heat = np.zeros((self.grid_h, self.grid_w), dtype=np.float32)
+        self.passes = 0
+        self._rects = None                # cached rects in grid units
+
+    @property
+    def ready(self) -> bool:
+        return self.passes >= self.warmup and bool(self.heat.max() >= self.min_hits)
+
+    def needs_full_scan(self) -> bool:
+        return not self.ready or self.passes % self.rescan_interval == 0
+
+    def add(self, boxes, frame_w: int, frame_h: int):
+        """Record one detection pass's face boxes (full-resolution x, y, w, h)."""
+        self.passes += 1
+        sx, sy = self.grid_w / frame_w, self.grid_h / frame_h
+        for (x, y, w, h) in boxes:
+            gx0, gy0 = int(x * sx), int(y * sy)
+            gx1, gy1 = int(np.ceil((x + w) * sx)), int(np.ceil((y + h) * sy))
+            self.heat[gy0:gy1, gx0:gx1] += 1.0
+        if len(boxes):
+            self._rects = None
+
+    def coverage(self) -> float:
+        """Fraction of the frame inside the learned mask (1.0 until ready)."""
+        if not self.ready:
+            return 1.0
+        return self._mask().mean()
+
+    def _mask(self) -> np.ndarray:
+        mask = (self.heat >= self.min_hits).astype(np.uint8)
+        if self.margin_cells:
+            k = 2 * self.margin_cells + 1
+            mask = cv2.dilate(mask, np.ones((k, k), np.uint8))
+        return mask
+
+    def rects(self, img_w: int, img_h: int) -> list:
+        """Regions to scan as (x0, y0, x1, y1) in the pixel space of an img_w x img_h image."""
+        if self._rects is None:
+            n, _, stats, _ = cv2.connectedComponentsWithStats(self._mask(), connectivity=8)
+            self._rects = merge_rects([(gx, gy, gx + gw, gy + gh) for gx, gy, gw, gh, _ in stats[1:n]])
+        sx, sy = img_w / self.grid_w, img_h / self.grid_h
+        return [(int(x0 * sx), int(y0 * sy), min(img_w, int(np.ceil(x1 * sx))), min(img_h, int(np.ceil(y1 * sy))))
+                for (x0, y0, x1, y1) in self._rects]
+
+
+def _seat_box(i: int, label, box) -> tuple:
+    """box as an (x, y, w, h) float tuple; ValueError naming seat i unless it is 4 finite numbers with w, h > 0."""
+    ok = (isinstance(box, (list, tuple)) and len(box) == 4
+          and all(isinstance(v, Real) and not isinstance(v, bool) and math.isfinite(v) for v in box))
+    if not ok or box[2] <= 0 or box[3] <= 0:
+        raise ValueError(f"seat {i} ({label}): expected [x, y, w, h] — 4 finite numbers with w, h > 0 — got {box!r}")
+    return tuple(float(v) for v in box)
+
+
+class SeatMap:
+    """Manual seat layout: named ROIs in normalized (0–1) x, y, w, h frame coordinates.
+
+    Raises ValueError (naming the seat) for a box that is not 4 finite numbers with positive w, h.
+    """
+
+    def __init__(self, seats: list):
+        self.seats = [(str(label), _seat_box(i, label, box)) for i, (label, box) in enumerate(seats)]
+
+    @classmethod
+    def grid(cls, rows: int, cols: int, bounds=(0.0, 0.0, 1.0, 1.0)) -> "SeatMap":
+        """rows x cols equal seats over bounds (x, y, w, h); labels like A1, A2 … B1 (front row last)."""
+        bx, by, bw, bh = bounds
+        cw, ch = bw / cols, bh / rows
+        seats = []
+        for r in range(rows):
+            for c in range(cols):
+                label = f"{chr(ord('A') + (rows - 1 - r) % 26)}{c + 1}"
+                seats.append((label, (bx + c * cw, by + r * ch, cw, ch)))
+        return cls(seats)
+
+    @classmethod
+    def from_json(cls, text: str) -> "SeatMap":
+        """Parse either [[x, y, w, h], …] or {"label": [x, y, w, h], …} (normalized coordinates)."""
+        data = json.loads(text)
+        if isinstance(data, dict):
+            return cls(list(data.items()))
+        if not isinstance(data, list):
+            raise ValueError("expected a JSON list or object of [x, y, w, h] boxes")
+        return cls([(f"S{i + 1}", box) for i, box in enumerate(data)])
+
+    def __len__(self):
+        return len(self.seats)
+
+    def rois(self, img_w: int, img_h: int) -> list:
+        """Seat ROIs as (x0, y0, x1, y1) in the pixel space of an img_w x img_h image."""
+        out = []
+        for _, (x, y, w, h) in self.seats:
+            out.append((max(0, int(x * img_w)), max(0, int(y * img_h)),
+                        min(img_w, int(np.ceil((x + w) * img_w))), min(img_h, int(np.ceil((y + h) * img_h)))))
+        return out
+
+    def assign(self, boxes, frame_w: int, frame_h: int) -> list:
+        """Seat index for each face box (by box centre), or -1 if it lies outside every seat."""
+        rois = self.rois(frame_w, frame_h)
+        out = []
+        for (x, y, w, h) in boxes:
+            cx, cy = x + w / 2, y + h / 2
+            idx = -1
+            for i, (x0, y0, x1, y1) in enumerate(rois):
+                if x0 <= cx < x1 and y0 <= cy < y1:
+                    idx = i
+                    break
+            out.append(idx)
+        return out
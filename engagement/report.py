@@ -0,0 +1,156 @@
+"""
+Recording reports.
+Turns the per-frame upload timeline (an engagement.store.ResultTable) into the summary,
+phase, seat and drop tables shown after an upload analysis, and writes them
+to disk as JSON or Parquet for batch runs.
+"""
+
+import json
+import os
+
+import pandas as pd
+
+from engagement.store import SEAT_PREFIX
+
+DROP_THRESHOLD = 60
+PHASES = [
+    ("Opening Phase", 0.0, 0.25),
+    ("Early Phase",   0.25, 0.5),
+    ("Mid Phase",     0.5, 0.75),
+    ("Final Phase",   0.75, 1.01),
+]
+FORMATS = ("json", "parquet")
+
+
+def status_for(score) -> str:
+    """Good / Watch / Critical for a score, Empty for None (unoccupied seat)."""
+    if score is None:
+        return "Empty"
+    return "Good" if score >= 70 else "Watch" if score >= 50 else "Critical"
+
+
+def frames_dataframe(records) -> pd.DataFrame:
+    """Column views of a ResultTable / ResultRing (no copy), or a DataFrame of plain row dicts."""
+    if hasattr(records, "to_dataframe"):
+        return records.to_dataframe()
+    return pd.DataFrame(records)
+
+
+def summarize(df: pd.DataFrame) -> dict:
+    """Recording-level metrics plus the video alerts that drive the intervention tier."""
+    n = len(df)
+    if n == 0:
+        return {"frames": 0, "avg_score": None, "min_score": None, "max_score": None,
+                "min_time_s": None, "total_alerts": 0, "drop_frames": 0, "critical_frames": 0,
+                "head_down_frames": 0, "video_alerts": []}
+    avg_score = float(df["score"].mean())
+    min_score = float(df["score"].min())
+    total_alerts = int(df["alerts"].sum())
+    drop_frames = int((df["score"] < DROP_THRESHOLD).sum())
+    critical_frames = int((df["score"] < 40).sum())
+    head_down_frames = int((df["faces"] == 0).sum())  # proxy: no faces = heads down / away
+
+    video_alerts = []
+    if critical_frames > 0:
+        video_alerts.append("CRITICAL: Engagement dropped below 40%")
+    if drop_frames > n * 0.3:
+        video_alerts.append("⚠ Sustained engagement drop across 30%+ of video")
+    if head_down_frames > n * 0.2:
+        video_alerts.append("⚠ Frequent head-down / faces not visible detected")
+    if total_alerts > 5:
+        video_alerts.append("⚠ Multiple distraction events logged")
+
+    return {
+        "frames": n,
+        "avg_score": avg_score,
+        "min_score": min_score,
+        "max_score": float(df["score"].max()),
+        "min_time_s": float(df.loc[df["score"].idxmin(), "time_s"]),
+        "total_alerts": total_alerts,
+        "drop_frames": drop_frames,
+        "critical_frames": critical_frames,
+        "head_down_frames": head_down_frames,
+        "video_alerts": video_alerts,
+    }
+
+
+def intervention_score(summary: dict) -> float:
+    """Score used to pick the intervention tier: the worst segment, not just the average."""
+    avg, mn = summary["avg_score"], summary["min_score"]
+    return min(avg, mn + (avg - mn) * 0.4)
+
+
+def phase_table(df: pd.DataFrame) -> pd.DataFrame:
+    """Average / minimum score and alert count per quarter of the recording."""
+    rows = []
+    if len(df):
+        total_dur = df["time_s"].max()
+        for label, start_pct, end_pct in PHASES:
+            mask = (df["time_s"] >= start_pct * total_dur) & (df["time_s"] < end_pct * total_dur)
+            seg = df[mask]
+            if len(seg) == 0:
+                continue
+            s = float(seg["score"].mean())
+            rows.append({"phase": label, "avg_score": s, "min_score": float(seg["score"].min()),
+                         "alerts": int(seg["alerts"].sum()), "status": status_for(s)})
+    return pd.DataFrame(rows, columns=["phase", "avg_score", "min_score", "alerts", "status"])
+
+
+def seat_table(df: pd.DataFrame) -> pd.DataFrame:
+    """Occupancy and score per seat; empty when the recording was analyzed without a seat map."""
+    cols = ["seat", "occupied", "avg_score", "min_score", "status"]
+    seat_cols = [c for c in df.columns if c.startswith(SEAT_PREFIX)]
+    rows = []
+    for name in seat_cols:
+        col = df[name].dropna()
+        s = float(col.mean()) if len(col) else None
+        rows.append({"seat": name[len(SEAT_PREFIX):], "occupied": len(col) / len(df), "avg_score": s,
+                     "min_score": float(col.min()) if len(col) else None, "status": status_for(s)})
+    return pd.DataFrame(rows, columns=cols)
+
+
+def drop_table(df: pd.DataFrame, threshold: float = DROP_THRESHOLD) -> pd.DataFrame:
+    """Frames scoring below threshold, with an mm:ss time column."""
+    if len(df) == 0:
+        return pd.DataFrame(columns=["time", "time_s", "frame", "score", "faces", "alerts"])
+    drops = df.loc[df["score"] < threshold, ["time_s", "frame", "score", "faces", "alerts"]].copy()
+    drops.insert(0, "time", drops["time_s"].apply(lambda x: f"{int(x//60):02d}:{int(x%60):02d}"))
+    return drops
+
+
+def _write_table(df: pd.DataFrame, path: str, fmt: str):
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_json(path, orient="records", indent=1, force_ascii=False)
+
+
+def write_report(records, out_dir: str, fmt: str = "json", meta: dict = None) -> dict:
+    """Write frames / phases / seats / drops tables and summary.json for one recording into out_dir.
+
+    Returns the summary (with meta merged in) so callers can build a cross-recording index.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown report format {fmt!r} (expected one of {', '.join(FORMATS)})")
+    os.makedirs(out_dir, exist_ok=True)
+    df = frames_dataframe(records)
+    summary = dict(meta or {}, **summarize(df))
+    tables = {"frames": df, "phases": phase_table(df), "drops": drop_table(df)}
+    seats = seat_table(df)
+    if len(seats):
+        tables["seats"] = seats
+    for name, table in tables.items():
+        path = os.path.join(out_dir, f"{name}.{fmt}")
+        if name == "frames" and fmt == "parquet" and hasattr(records, "write_parquet"):
+            records.write_parquet(path)          # straight from the columns, empty seats as nulls
+        else:
+            _write_table(table, path, fmt)
+    with open(os.path.join(out_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=1, ensure_ascii=False)
+    return summary
+
+
+def has_parquet_engine() -> bool:
+    """True if pandas can write Parquet (pyarrow or fastparquet installed)."""
+    import importlib.util as _ilu
+    return any(_ilu.find_spec(m) is not None for m in ("pyarrow", "fastparquet"))
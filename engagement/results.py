@@ -0,0 +1,130 @@
+"""
+Per-frame analysis results.
+FrameResult holds the numbers plus face / eye boxes and labels as plain
+tuples and keeps a reference to the analyzed frame; the annotated image is
+only rasterized when something reads `annotations` (i.e. the frame is shown).
+"""
+
+import time
+from datetime import datetime
+
+import cv2
+
+from engagement.metrics import METRICS
+
+HUD_HEIGHT = 50
+
+# BGR colours per engagement state label
+_STATE_COLORS = {"HEAD DOWN": (255, 51, 85), "DISTRACTED": (255, 204, 0), "ENGAGED": (0, 255, 136)}
+
+
+class FrameResult:
+    """Result of EngagementEngine.analyze_frame().
+
+    Fields are attributes; `result["key"]` and `result.get("key")` also work so
+    callers written against the old result dict keep working. The source frame
+    is referenced, never copied, and must not be modified while the result is alive.
+    """
+
+    __slots__ = ("timestamp", "faces_detected", "eyes_detected", "head_down_count",
+                 "distracted_count", "looking_away", "blink_rate", "posture_issues",
+                 "engagement_score", "alerts", "track_ids", "full_detection",
+                 "scanned_fraction", "reused", "motion", "seats", "backend",
+                 "face_boxes", "face_states", "face_ids", "eye_boxes", "seat_rois",
+                 "frame", "_annotations")
+
+    # Keys returned by to_dict() — everything except the image data
+    FIELDS = __slots__[:-2]
+
+    def __init__(self, frame, timestamp: float, backend: str = None):
+        self.timestamp = timestamp
+        self.faces_detected = 0
+        self.eyes_detected = 0
+        self.head_down_count = 0
+        self.distracted_count = 0
+        self.looking_away = 0
+        self.blink_rate = 0.0
+        self.posture_issues = 0
+        self.engagement_score = 100.0
+        self.alerts = []
+        self.track_ids = []
+        self.full_detection = False
+        self.scanned_fraction = 1.0
+        self.reused = False           # motion gate: detections carried over from the previous frame unchanged
+        self.motion = None            # motion gate: fraction of the frame that changed, None when gating is off
+        self.seats = []
+        self.backend = backend
+        self.face_boxes = []          # (x, y, w, h) per face, full-resolution pixels
+        self.face_states = []         # ENGAGED / DISTRACTED / HEAD DOWN per face
+        self.face_ids = []            # track ID per face, None when untracked
+        self.eye_boxes = []           # (x, y, w, h) of every detected eye
+        self.seat_rois = []           # (x0, y0, x1, y1) seat outlines, when a seat map is set
+        self.frame = frame
+        self._annotations = None
+
+    def __getitem__(self, key: str):
+        if key == "annotations":
+            return self.annotations
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    @property
+    def annotations(self):
+        """Annotated copy of the frame (boxes, labels, seats, HUD), rendered on first access."""
+        if self._annotations is None:
+            t0 = time.perf_counter() if METRICS.enabled else None
+            self._annotations = render_annotations(self.frame, self)
+            if t0 is not None:
+                METRICS.since("hud", t0)
+        return self._annotations
+
+    def to_dict(self) -> dict:
+        """Plain dict of every field except the frame and its annotations."""
+        return {k: getattr(self, k) for k in self.FIELDS}
+
+
+def render_annotations(frame, result: FrameResult):
+    """Draw a result's face / eye boxes, labels, seat outlines and HUD onto a copy of frame."""
+    annotated = frame.copy()
+    if result.backend is None:
+        return annotated
+
+    for (x, y, fw, fh), state, track_id in zip(result.face_boxes, result.face_states, result.face_ids):
+        tag = f"#{track_id} " if track_id is not None else ""
+        cv2.rectangle(annotated, (x, y), (x+fw, y+fh), (0, 255, 136), 2)
+        cv2.putText(annotated, f"{tag}{state}", (x, y-8),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.45, _STATE_COLORS.get(state, (0, 255, 136)), 1)
+    for (ex, ey, ew, eh) in result.eye_boxes:
+        cv2.rectangle(annotated, (ex, ey), (ex+ew, ey+eh), (255, 204, 0), 1)
+    for (x0, y0, x1, y1) in result.seat_rois:
+        cv2.rectangle(annotated, (x0, y0), (x1 - 1, y1 - 1), (80, 80, 80), 1)
+
+    draw_hud(annotated, result)
+    return annotated
+
+
+def draw_hud(frame, result: FrameResult):
+    """Draw the minimal HUD bar onto the bottom HUD_HEIGHT rows of frame, in place."""
+    h, w = frame.shape[:2]
+    # Darken only the bottom strip: equivalent to blending a black bar at 65% opacity
+    strip = frame[max(0, h - HUD_HEIGHT):h]
+    cv2.addWeighted(strip, 0.35, strip, 0.0, 0, dst=strip)
+
+    score = result.engagement_score
+    color = (0, 255, 136) if score >= 70 else (0, 204, 255) if score >= 50 else (51, 51, 255)
+
+    cv2.putText(frame, f"ENGAGEMENT: {score:.0f}%", (10, h-15),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    cv2.putText(frame, f"FACES: {result.faces_detected}  EYES: {result.eyes_detected}",
+                (w//2 - 80, h-15), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (180, 180, 180), 1)
+    ts = datetime.fromtimestamp(result.timestamp).strftime("%H:%M:%S")
+    cv2.putText(frame, ts, (w - 80, h-15),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.45, (100, 100, 100), 1)
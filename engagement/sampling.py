@@ -0,0 +1,205 @@
+"""
+Frame sampling for video decode.
+Decides which frames get analyzed — every Nth frame, N frames per second
+of video time, or (live) a rate steered toward a CPU or latency budget — and
+advances past the others with grab() / seeks so skipped frames are never
+retrieved and converted to BGR.
+"""
+
+import time
+
+import cv2
+
+from engagement.metrics import METRICS
+
+
+class FrameSampler:
+    """Selects the 1-based frame indices to analyze.
+
+    With sample_fps set, frames are picked so that roughly sample_fps frames are
+    analyzed per second of video regardless of the source frame rate; otherwise
+    every frame_skip-th frame is analyzed. Selection is a pure function of the
+    frame index, so chunked / parallel readers agree with sequential ones.
+    """
+
+    def __init__(self, frame_skip: int = 1, sample_fps: float = None, fps: float = 25.0):
+        self.frame_skip = max(1, int(frame_skip))
+        self.fps = float(fps) if fps and fps > 0 else 25.0
+        self.sample_fps = float(sample_fps) if sample_fps else None
+        if self.sample_fps is not None and self.sample_fps >= self.fps:
+            self.sample_fps, self.frame_skip = None, 1
+
+    def should_analyze(self, frame_idx: int) -> bool:
+        if self.sample_fps is None:
+            return frame_idx % self.frame_skip == 0
+        r = self.sample_fps / self.fps
+        return int(frame_idx * r) != int((frame_idx - 1) * r)
+
+    def next_index(self, frame_idx: int) -> int:
+        """First analyzed index strictly after frame_idx."""
+        if self.sample_fps is None:
+            return (frame_idx // self.frame_skip + 1) * self.frame_skip
+        nxt = frame_idx + 1
+        while not self.should_analyze(nxt):
+            nxt += 1
+        return nxt
+
+    @property
+    def analyzed_per_second(self) -> float:
+        return self.sample_fps if self.sample_fps is not None else self.fps / self.frame_skip
+
+
+class AdaptiveSampler:
+    """Selects live frames to analyze at a rate steered toward a CPU or latency budget.
+
+    Every analysis is fed back with record(). With cpu_share set, the rate is
+    capped so that analysis keeps one core busy at most that fraction of the
+    time. With latency_ms set, the capture → result latency is controlled:
+    while it is over budget because frames queue up, the rate is cut in
+    proportion; while it is under budget, the rate creeps back up. The rate
+    never goes past what the analysis can sustain and stays within
+    [min_fps, max_fps]. `rate` is the chosen rate and `limit` names the bound
+    that set it.
+    """
+
+    def __init__(self, cpu_share: float = None, latency_ms: float = None,
+                 min_fps: float = 0.5, max_fps: float = 30.0, update_interval: float = 0.5):
+        if cpu_share is None and latency_ms is None:
+            raise ValueError("AdaptiveSampler needs a cpu_share or latency_ms budget")
+        self.cpu_share = cpu_share
+        self.latency_ms = latency_ms
+        self.min_fps, self.max_fps = float(min_fps), float(max_fps)
+        self.update_interval = update_interval
+        self.rate = self.min_fps        # analyzed frames per second
+        self.limit = "start"            # cpu / latency / cost / throughput / min / max
+        self._cost = None               # smoothed seconds per analysis
+        self._latency = None            # smoothed seconds from capture to result
+        self._next_due = 0.0
+        self._next_update = 0.0
+
+    def should_analyze(self, t: float) -> bool:
+        """True if the frame captured at perf_counter() time t is due for analysis."""
+        if t < self._next_due:
+            return False
+        period = 1.0 / self.rate
+        # Keep the cadence, without banking time during which no frames arrived
+        self._next_due = self._next_due + period if t - self._next_due < period else t + period
+        return True
+
+    def record(self, cost: float, latency: float, now: float = None, alpha: float = 0.3):
+        """Feed back one analysis: how long it took and its capture → result latency, in seconds."""
+        if self._cost is None:
+            self._cost, self._latency = cost, latency
+            self.rate = min(self.max_fps, max(self.min_fps, 0.5 / max(cost, 1e-4)))    # start at half a core
+        else:
+            self._cost += alpha * (cost - self._cost)
+            self._latency += alpha * (latency - self._latency)
+        now = time.perf_counter() if now is None else now
+        if now >= self._next_update:
+            self._next_update = now + self.update_interval
+            self._update()
+
+    def _update(self):
+        cost = max(self._cost, 1e-4)
+        bounds = {"max": self.max_fps, "throughput": 0.9 / cost}   # past ~90% busy the queue only grows
+        if self.cpu_share is not None:
+            bounds["cpu"] = self.cpu_share / cost
+        if self.latency_ms is not None:
+            budget = self.latency_ms / 1000.0
+            if self._latency <= budget:
+                bounds["latency"] = self.rate + max(0.25, 0.1 * self.rate)
+            elif self._latency - cost > 0.25 * cost:
+                bounds["latency"] = self.rate * max(0.5, budget / self._latency)
+            else:
+                bounds["cost"] = self.rate      # one analysis alone exceeds the budget; slowing down won't help
+        self.limit, rate = min(bounds.items(), key=lambda kv: kv[1])
+        if rate < self.min_fps:
+            self.limit, rate = "min", self.min_fps
+        self.rate = rate
+
+    def get_stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "limit": self.limit,
+            "cost_ms": (self._cost or 0.0) * 1000.0,
+            "latency_ms": (self._latency or 0.0) * 1000.0,
+        }
+
+
+def _seek(cap, pos: int) -> bool:
+    """Seek to 0-based position pos; True only if the backend landed exactly there."""
+    if not cap.set(cv2.CAP_PROP_POS_FRAMES, pos):
+        return False
+    return int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == pos
+
+
+def open_video_at(path: str, start: int):
+    """Open the video positioned at frame `start`, falling back to grabbing forward if seeking is inexact."""
+    cap = cv2.VideoCapture(path)
+    if start == 0:
+        return cap
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    if int(cap.get(cv2.CAP_PROP_POS_FRAMES)) == start:
+        return cap
+    cap.release()
+    cap = cv2.VideoCapture(path)
+    for _ in range(start):
+        if not cap.grab():
+            break
+    return cap
+
+
+def iter_sampled_frames(cap, sampler: FrameSampler, start: int = 0, end: int = None,
+                        seek_gap: int = 120):
+    """Yield (frame_idx, frame) for the frames the sampler selects.
+
+    cap must be positioned at 0-based frame `start`; frame_idx is 1-based like the
+    upload loop. Skipped frames are advanced with grab() (no retrieve/BGR convert);
+    gaps longer than seek_gap frames are jumped with a verified seek instead.
+    """
+    pos = start                      # 0-based position of the next frame the decoder returns
+    seekable = seek_gap is not None and seek_gap > 0
+    while end is None or pos < end:
+        target = sampler.next_index(pos) - 1          # 0-based position of next analyzed frame
+        if end is not None and target >= end:
+            return
+        t0 = time.perf_counter() if METRICS.enabled else None
+        gap = target - pos
+        if seekable and gap > seek_gap:
+            if _seek(cap, target):
+                pos = target
+                gap = 0
+            else:
+                # Inexact or unsupported seeking — resume from wherever the decoder is and grab from here on
+                seekable = False
+                landed = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+                if not 0 <= landed <= target:
+                    return
+                pos = landed
+                gap = target - pos
+        for _ in range(gap):
+            if not cap.grab():
+                return
+            pos += 1
+        if not cap.grab():
+            return
+        ret, frame = cap.retrieve()
+        pos += 1
+        if not ret:
+            return
+        if t0 is not None:
+            METRICS.since("decode", t0)
+        yield pos, frame
+
+
+def iter_batches(items, size: int):
+    """Group an iterable into lists of up to `size` items (the last list may be shorter)."""
+    size = max(1, int(size))
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
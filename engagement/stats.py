@@ -0,0 +1,112 @@
+"""
+Incremental rolling statistics.
+Keeps mean, min / max, the recent-vs-previous trend and the number of drop
+crossings over a sliding window of engagement scores, updated in O(1) per
+pushed score so summaries cost the same whatever the window size.
+"""
+
+import math
+from collections import deque
+
+
+class RollingStats:
+    """Sliding-window summary of the last `window` scores.
+
+    * mean — running sum, re-summed exactly once per `window` pushes so float drift cannot build up
+    * min / max — monotonic deques of (index, value)
+    * trend — running sums of the last `trend_window` scores and the `trend_window` before them
+    * drop events — count of adjacent pairs in the window that cross from >= threshold to < threshold
+    """
+
+    def __init__(self, window: int = 150, trend_window: int = 20, drop_threshold: float = 60.0):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = int(window)
+        self.trend_window = int(trend_window)
+        self.drop_threshold = drop_threshold
+        self.reset()
+
+    def reset(self):
+        self._buf = [0.0] * self.window
+        self._n = 0                     # total scores ever pushed; the newest has index _n - 1
+        self._sum = 0.0
+        self._recent = 0.0              # sum of the last trend_window scores
+        self._prev = 0.0                # sum of the trend_window scores before those
+        self._min = deque()
+        self._max = deque()
+        self.drop_events = 0
+
+    def __len__(self):
+        return min(self._n, self.window)
+
+    def _at(self, idx: int) -> float:
+        """Score with absolute index idx (must still be inside the window)."""
+        return self._buf[idx % self.window]
+
+    def push(self, x: float):
+        x = float(x)
+        w, tw, n = self.window, self.trend_window, self._n
+
+        if n >= w:
+            # Evict the oldest score, and with it the (oldest, next) pair from the drop count
+            old_idx = n - w
+            old = self._at(old_idx)
+            self._sum -= old
+            if w > 1 and old >= self.drop_threshold > self._at(old_idx + 1):
+                self.drop_events -= 1
+        if n >= 1 and self._at(n - 1) >= self.drop_threshold > x and w > 1:
+            self.drop_events += 1
+
+        # Trend windows shift by one: x enters recent, recent's oldest moves to prev, prev's oldest leaves
+        if tw:
+            if n >= tw:
+                moved = self._at(n - tw)
+                self._recent -= moved
+                self._prev += moved
+            if n >= 2 * tw:
+                self._prev -= self._at(n - 2 * tw)
+            self._recent += x
+
+        self._buf[n % w] = x
+        self._n = n + 1
+        self._sum += x
+        if self._n % w == 0:
+            self._sum = math.fsum(self._buf)
+            if tw and 2 * tw <= w:
+                self._recent = math.fsum(self._at(i) for i in range(self._n - tw, self._n))
+                self._prev = math.fsum(self._at(i) for i in range(max(0, self._n - 2 * tw), self._n - tw))
+
+        lo = self._n - w                # smallest index still in the window
+        while self._min and self._min[-1][1] >= x:
+            self._min.pop()
+        self._min.append((n, x))
+        while self._min[0][0] < lo:
+            self._min.popleft()
+        while self._max and self._max[-1][1] <= x:
+            self._max.pop()
+        self._max.append((n, x))
+        while self._max[0][0] < lo:
+            self._max.popleft()
+
+    def values(self) -> list:
+        """Scores currently in the window, oldest first."""
+        return [self._at(i) for i in range(max(0, self._n - self.window), self._n)]
+
+    @property
+    def mean(self) -> float:
+        return self._sum / len(self) if self._n else 0.0
+
+    @property
+    def min(self) -> float:
+        return self._min[0][1] if self._n else 0.0
+
+    @property
+    def max(self) -> float:
+        return self._max[0][1] if self._n else 0.0
+
+    def trend_diff(self):
+        """Mean of the last trend_window scores minus the mean of the trend_window before them, or None."""
+        tw = self.trend_window
+        if not tw or len(self) < 2 * tw:
+            return None
+        return (self._recent - self._prev) / tw
@@ -0,0 +1,207 @@
+"""
+Columnar per-frame result store.
+Fixed-dtype numpy records (a few tens of bytes per analyzed frame) instead of
+one Python dict per frame: a ring buffer for the live dashboard and a chunked,
+growable table for upload / batch timelines. Both hand pandas column views
+(no copy) and export to Arrow / Parquet.
+"""
+
+import numpy as np
+
+# frame index, time (s into the video, or epoch seconds live), score and per-frame counts — 30 bytes
+BASE_FIELDS = [
+    ("frame", "<i4"),
+    ("time_s", "<f8"),
+    ("score", "<f8"),
+    ("faces", "<u2"),
+    ("eyes", "<u2"),
+    ("head_down", "<u2"),
+    ("distracted", "<u2"),
+    ("alerts", "<u2"),
+]
+SEAT_PREFIX = "seat:"
+
+
+def record_dtype(seat_labels: tuple = ()) -> np.dtype:
+    """Row dtype; with a seat map, per-seat scores are one float32 sub-array (NaN = empty seat)."""
+    fields = list(BASE_FIELDS)
+    if seat_labels:
+        fields.append(("seat_scores", "<f4", (len(seat_labels),)))
+    return np.dtype(fields)
+
+
+class _ColumnStore:
+    """Shared schema handling; subclasses provide _append_row and to_numpy.
+
+    The seat columns are fixed by the first appended result that has seats.
+    """
+
+    def __init__(self, seat_labels: tuple = ()):
+        self.seat_labels = tuple(seat_labels)
+        self.dtype = record_dtype(self.seat_labels)
+
+    def append(self, frame_idx: int, time_s: float, result):
+        """Store one analyzed frame (a FrameResult or result dict)."""
+        seats = result.get("seats")
+        if seats and not self.seat_labels and not len(self):
+            self.seat_labels = tuple(s["seat"] for s in seats)
+            self.dtype = record_dtype(self.seat_labels)
+            self._reset_buffers()
+        row = (frame_idx, time_s, result["engagement_score"], result["faces_detected"],
+               result["eyes_detected"], result["head_down_count"], result["distracted_count"],
+               len(result["alerts"]))
+        if self.seat_labels:
+            scores = {s["seat"]: s["score"] for s in seats or ()}
+            row += ([np.nan if scores.get(label) is None else scores[label] for label in self.seat_labels],)
+        self._append_row(row)
+
+    def columns(self, rows: np.ndarray = None) -> dict:
+        """{column: 1-D view} over `rows` (default: everything, oldest first); seats become seat:<label>."""
+        rows = self.to_numpy() if rows is None else rows
+        cols = {name: rows[name] for name, *_ in BASE_FIELDS}
+        for i, label in enumerate(self.seat_labels):
+            cols[SEAT_PREFIX + label] = rows["seat_scores"][:, i]
+        return cols
+
+    def to_dataframe(self, rows: np.ndarray = None):
+        """DataFrame whose columns are views of the store — no copy.
+
+        The frame shares memory with the buffer: copy() it before the store
+        is appended to again if it must outlive that (ring buffers overwrite).
+        """
+        import pandas as pd
+        return pd.DataFrame(self.columns(rows), copy=False)
+
+    def to_arrow(self):
+        import pyarrow as pa
+        # from_pandas maps NaN seat scores to nulls (empty seat)
+        return pa.table({name: pa.array(col, from_pandas=True) for name, col in self.columns().items()})
+
+    def write_parquet(self, path: str):
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(), path)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self) * self.dtype.itemsize
+
+
+class ResultRing(_ColumnStore):
+    """Last `capacity` frames for the live dashboard.
+
+    Each row is written twice, capacity rows apart, so the newest n rows are
+    always one contiguous slice — tail(n) and to_dataframe never copy or wrap.
+    """
+
+    def __init__(self, capacity: int = 300, seat_labels: tuple = ()):
+        self.capacity = int(capacity)
+        super().__init__(seat_labels)
+        self._reset_buffers()
+
+    def _reset_buffers(self):
+        self._buf = np.zeros(2 * self.capacity, self.dtype)
+        self._n = 0
+
+    def __len__(self):
+        return min(self._n, self.capacity)
+
+    @property
+    def total(self) -> int:
+        """Rows appended since creation, including ones already overwritten."""
+        return self._n
+
+    def _append_row(self, row: tuple):
+        i = self._n % self.capacity
+        self._buf[i] = row
+        self._buf[i + self.capacity] = row
+        self._n += 1
+
+    def tail(self, n: int = None) -> np.ndarray:
+        """The newest n rows (default: all held), oldest first, as a view."""
+        held = len(self)
+        n = held if n is None else min(n, held)
+        end = self._n % self.capacity + (self.capacity if self._n >= self.capacity else 0)
+        return self._buf[end - n:end]
+
+    def to_numpy(self) -> np.ndarray:
+        return self.tail()
+
+
+class ResultTable(_ColumnStore):
+    """Growable upload / batch timeline: fixed-size chunks, joined into one array on first read.
+
+    Appending never reallocates what is already stored; to_numpy() concatenates
+    the chunks once and keeps the result, so repeated reads are copy-free.
+    """
+
+    def __init__(self, chunk_size: int = 4096, seat_labels: tuple = ()):
+        self.chunk_size = int(chunk_size)
+        super().__init__(seat_labels)
+        self._reset_buffers()
+
+    def _reset_buffers(self):
+        self._chunks = []       # full (or frozen) arrays
+        self._cur = None        # chunk being filled, allocated on the next append
+        self._cur_n = 0
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def _append_row(self, row: tuple):
+        if self._cur is None or self._cur_n == len(self._cur):
+            self._freeze()
+            self._cur = np.zeros(self.chunk_size, self.dtype)
+            self._cur_n = 0
+        self._cur[self._cur_n] = row
+        self._cur_n += 1
+        self._len += 1
+
+    def extend(self, other: "ResultTable"):
+        """Append every row of another table (e.g. a worker's chunk) in order."""
+        if not len(other):
+            return
+        if not len(self) and other.seat_labels != self.seat_labels:
+            self.seat_labels, self.dtype = other.seat_labels, other.dtype
+            self._reset_buffers()
+        if other.dtype != self.dtype:
+            raise ValueError("Cannot merge result tables with different seat layouts")
+        self._freeze()
+        self._chunks.append(other.to_numpy())
+        self._len += len(other)
+
+    @classmethod
+    def from_numpy(cls, rows: np.ndarray, seat_labels: tuple = ()) -> "ResultTable":
+        """Table wrapping existing rows (no copy), e.g. loaded back from the result cache."""
+        out = cls(seat_labels=seat_labels)
+        if rows.dtype != out.dtype:
+            raise ValueError("rows do not match the record dtype for these seats")
+        if len(rows):
+            out._chunks = [rows]
+            out._len = len(rows)
+        return out
+
+    @classmethod
+    def concat(cls, tables) -> "ResultTable":
+        out = cls()
+        for t in tables:
+            out.extend(t)
+        return out
+
+    def _freeze(self):
+        """Move the partly filled current chunk into the chunk list (trimmed, as a view)."""
+        if self._cur_n:
+            self._chunks.append(self._cur[:self._cur_n])
+        self._cur = None
+        self._cur_n = 0
+
+    def to_numpy(self) -> np.ndarray:
+        self._freeze()
+        if len(self._chunks) != 1:
+            self._chunks = [np.concatenate(self._chunks) if self._chunks else np.zeros(0, self.dtype)]
+        return self._chunks[0]
+
+    def __getstate__(self):
+        # Pickle (worker → parent) only the stored rows, not the empty tail of the current chunk
+        self.to_numpy()
+        return dict(self.__dict__)
@@ -0,0 +1,124 @@
+"""
+Synthetic exam-hall footage.
+Deterministic, offline-rendered frames and videos of a hall with N students,
+used by the benchmark suite and the backend probe. The drawn faces are found
+by the Haar cascades; the CenterFace DNN does not respond to drawings, so only
+its timings (not its detection counts) are meaningful on this footage.
+Same arguments and seed → bit-identical frames.
+"""
+
+import cv2
+import numpy as np
+
+from engagement.backends import DISTRACTED, ENGAGED, HEAD_DOWN
+
+
+def draw_face(size: int, rng: np.random.Generator, state: str = ENGAGED) -> tuple:
+    """One size x size face sprite and its alpha mask; HEAD_DOWN shows hair only, DISTRACTED one eye."""
+    s = size
+    img = np.zeros((s, s, 3), np.uint8)
+    alpha = np.zeros((s, s), np.uint8)
+    skin = (np.array([150, 170, 205]) * rng.uniform(0.7, 1.1)).tolist()
+    hair = (np.array([30, 30, 40]) * rng.uniform(0.6, 1.6)).tolist()
+    centre, axes = (s // 2, int(s * 0.52)), (int(s * 0.36), int(s * 0.46))
+    cv2.ellipse(alpha, centre, axes, 0, 0, 360, 255, -1)
+
+    if state == HEAD_DOWN:
+        # Top of the head facing the camera
+        cv2.ellipse(img, centre, axes, 0, 0, 360, hair, -1)
+        cv2.ellipse(img, (s // 2, int(s * 0.85)), (int(s * 0.22), int(s * 0.1)), 0, 0, 360, skin, -1)
+    else:
+        cv2.ellipse(img, centre, axes, 0, 0, 360, skin, -1)
+        cv2.ellipse(img, (s // 2, int(s * 0.22)), (int(s * 0.38), int(s * 0.2)), 0, 180, 360, hair, -1)
+        eyes = (0.34, 0.66) if state == ENGAGED else (0.62,)
+        for ex in eyes:
+            e = (int(s * ex), int(s * 0.45))
+            cv2.ellipse(img, e, (int(s * 0.09), int(s * 0.045)), 0, 0, 360, (235, 235, 235), -1)
+            cv2.circle(img, e, int(s * 0.035), (40, 30, 20), -1)
+            cv2.line(img, (int(s * (ex - 0.1)), int(s * 0.37)), (int(s * (ex + 0.1)), int(s * 0.36)),
+                     (40, 40, 50), max(1, s // 40))
+        nose_x = s // 2 if state == ENGAGED else int(s * 0.68)
+        cv2.line(img, (nose_x, int(s * 0.48)), (nose_x - int(s * 0.04), int(s * 0.62)),
+                 [c * 0.7 for c in skin], max(1, s // 50))
+        cv2.ellipse(img, (nose_x, int(s * 0.74)), (int(s * 0.12), int(s * 0.04)), 0, 0, 180,
+                    (60, 60, 150), max(1, s // 30))
+    sigma = max(0.5, s / 60)
+    return cv2.GaussianBlur(img, (0, 0), sigma), cv2.GaussianBlur(alpha, (0, 0), sigma)
+
+
+class SyntheticHall:
+    """A fixed camera view of n_faces students in a seat grid.
+
+    Faces are sized from each student's share of the frame (like detection_params
+    assumes), sway by a pixel or two per frame, and a deterministic subset of them
+    is distracted or head-down, changing every few seconds of video.
+    """
+
+    def __init__(self, width: int = 1280, height: int = 720, n_faces: int = 6, seed: int = 0,
+                 fps: float = 25.0):
+        self.width, self.height, self.n_faces, self.fps = width, height, n_faces, fps
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        cols = max(1, int(round(np.sqrt(n_faces * width / height))))
+        rows = -(-n_faces // cols)
+        cw, ch = width / cols, height / rows
+        self.face_size = int(min(cw, ch) * 0.55)
+
+        # Background: wall, floor gradient and desk rows, with a little sensor noise baked in
+        bg = np.empty((height, width, 3), np.float32)
+        bg[:] = np.linspace(70, 110, height, dtype=np.float32)[:, None, None]
+        bg += rng.normal(0, 4, (height, width, 1)).astype(np.float32)
+        for r in range(rows):
+            y = int((r + 0.85) * ch)
+            cv2.rectangle(bg, (0, y), (width, min(height, y + max(2, int(ch * 0.12)))), (55, 75, 105), -1)
+        self.background = np.clip(bg, 0, 255).astype(np.uint8)
+
+        self.seats = []
+        for i in range(n_faces):
+            r, c = divmod(i, cols)
+            x = int((c + 0.5) * cw - self.face_size / 2 + rng.uniform(-0.1, 0.1) * cw)
+            y = int((r + 0.45) * ch - self.face_size / 2)
+            x = int(np.clip(x, 0, width - self.face_size))
+            y = int(np.clip(y, 0, height - self.face_size))
+            self.seats.append((x, y))
+        self.phase = rng.uniform(0, 2 * np.pi, n_faces)
+        self.sprites = {state: [draw_face(self.face_size, np.random.default_rng((seed, i)), state)
+                                for i in range(n_faces)]
+                        for state in (ENGAGED, DISTRACTED, HEAD_DOWN)}
+
+    def state_of(self, face: int, frame_idx: int) -> str:
+        """Roughly 1 in 6 students distracted and 1 in 8 head-down, reshuffled every 3 s of video."""
+        period = int((frame_idx / self.fps) // 3)
+        u = np.random.default_rng((self.seed, face, period)).random()
+        return HEAD_DOWN if u < 1 / 8 else DISTRACTED if u < 1 / 8 + 1 / 6 else ENGAGED
+
+    def frame(self, frame_idx: int) -> np.ndarray:
+        out = self.background.copy()
+        s = self.face_size
+        t = frame_idx / self.fps
+        for i, (x, y) in enumerate(self.seats):
+            dx = int(round(2 * np.sin(1.3 * t + self.phase[i])))
+            dy = int(round(1.5 * np.cos(0.9 * t + self.phase[i])))
+            x0 = int(np.clip(x + dx, 0, self.width - s))
+            y0 = int(np.clip(y + dy, 0, self.height - s))
+            img, alpha = self.sprites[self.state_of(i, frame_idx)][i]
+            roi = out[y0:y0+s, x0:x0+s]
+            a = alpha[:, :, None].astype(np.uint16)
+            roi[:] = ((img * a + roi * (255 - a)) // 255).astype(np.uint8)
+        return out
+
+    def frames(self, n: int, start: int = 0):
+        for i in range(start, start + n):
+            yield self.frame(i)
+
+    def write_video(self, path: str, n_frames: int, fourcc: str = "MJPG") -> str:
+        """Render n_frames into a video file (MJPG AVI by default, which every OpenCV build can write)."""
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), self.fps, (self.width, self.height))
+        if not writer.isOpened():
+            raise RuntimeError(f"Could not open a {fourcc} video writer for {path}")
+        try:
+            for f in self.frames(n_frames):
+                writer.write(f)
+        finally:
+            writer.release()
+        return path
@@ -0,0 +1,122 @@
+"""
+Multi-face tracker.
+Associates face boxes across frames by IoU and hands out stable per-student
+track IDs, and decides when the engine has to fall back to a full-frame
+detection pass instead of cheap per-track ROI updates.
+"""
+
+import numpy as np
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between (N, 4) and (M, 4) arrays of x, y, w, h boxes."""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    ax2, ay2 = a[:, 0] + a[:, 2], a[:, 1] + a[:, 3]
+    bx2, by2 = b[:, 0] + b[:, 2], b[:, 1] + b[:, 3]
+    iw = np.clip(np.minimum(ax2[:, None], bx2[None]) - np.maximum(a[:, None, 0], b[None, :, 0]), 0, None)
+    ih = np.clip(np.minimum(ay2[:, None], by2[None]) - np.maximum(a[:, None, 1], b[None, :, 1]), 0, None)
+    inter = iw * ih
+    union = (a[:, 2] * a[:, 3])[:, None] + (b[:, 2] * b[:, 3])[None] - inter
+    return inter / np.maximum(union, 1e-6)
+
+
+class Track:
+    """One tracked face."""
+
+    __slots__ = ("track_id", "box", "hits", "misses")
+
+    def __init__(self, track_id: int, box):
+        self.track_id = track_id
+        self.box = tuple(int(v) for v in box)
+        self.hits = 1
+        self.misses = 0
+
+
+class FaceTracker:
+    """IoU tracker driving a detect-every-K-frames schedule.
+
+    Full-frame detection is requested every `detect_interval` analyzed frames,
+    whenever there are no tracks, or as soon as a track that was being followed
+    misses an ROI update. A track the re-detection cannot find either just ages
+    out after `max_missed` misses without forcing further full passes.
+    In between, the engine re-detects each face inside a small window around
+    its last box and feeds the hits back through `update`.
+    """
+
+    def __init__(self, detect_interval: int = 10, iou_threshold: float = 0.3,
+                 max_missed: int = 2, roi_margin: float = 0.4):
+        self.detect_interval = max(1, int(detect_interval))
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.roi_margin = roi_margin
+        self.tracks = []
+        self._next_id = 1
+        self._since_full = 0
+        self._lost = False
+
+    def reset(self):
+        self.tracks = []
+        self._next_id = 1
+        self._since_full = 0
+        self._lost = False
+
+    def needs_full_detection(self) -> bool:
+        return (not self.tracks or self._lost
+                or self._since_full >= self.detect_interval)
+
+    def roi_for(self, track: Track, frame_w: int, frame_h: int) -> tuple:
+        """Search window (x0, y0, x1, y1) around a track's last box."""
+        x, y, w, h = track.box
+        mx, my = int(w * self.roi_margin), int(h * self.roi_margin)
+        return (max(0, x - mx), max(0, y - my),
+                min(frame_w, x + w + mx), min(frame_h, y + h + my))
+
+    def update(self, boxes, full: bool) -> list:
+        """Associate detected boxes with tracks; returns the live tracks in a stable order.
+
+        With full=False only existing tracks are updated (ROI pass) and unmatched
+        boxes are ignored; with full=True unmatched boxes start new tracks.
+        """
+        boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+        if full:
+            self._since_full = 1
+            self._lost = False
+        else:
+            self._since_full += 1
+
+        ious = iou_matrix(np.array([t.box for t in self.tracks]).reshape(-1, 4), boxes)
+        matched_t, matched_b = set(), set()
+        # Greedy assignment, best overlap first
+        for flat in np.argsort(-ious, axis=None):
+            ti, bi = np.unravel_index(flat, ious.shape)
+            if ious[ti, bi] < self.iou_threshold:
+                break
+            if ti in matched_t or bi in matched_b:
+                continue
+            matched_t.add(ti)
+            matched_b.add(bi)
+            tr = self.tracks[ti]
+            tr.box = tuple(int(v) for v in boxes[bi])
+            tr.hits += 1
+            tr.misses = 0
+
+        survivors = []
+        for ti, tr in enumerate(self.tracks):
+            if ti not in matched_t:
+                tr.misses += 1
+                if not full and tr.misses == 1:
+                    self._lost = True       # newly lost; a full pass already looked everywhere
+                if tr.misses > self.max_missed:
+                    continue
+            survivors.append(tr)
+        self.tracks = survivors
+
+        if full:
+            for bi in range(len(boxes)):
+                if bi not in matched_b:
+                    self.tracks.append(Track(self._next_id, boxes[bi]))
+                    self._next_id += 1
+        return list(self.tracks)
@@ -0,0 +1,136 @@
+"""
+Upload spool.
+Copies uploaded recordings to disk in fixed-size chunks (never the whole file
+in memory), names them by content hash so reruns and repeat uploads reuse one
+file, and deletes each file when the last reference to it is released or
+garbage-collected.
+"""
+
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+
+CHUNK_SIZE = 1 << 20        # 1 MiB
+
+
+class UploadRef:
+    """A reference to a spooled file; release() (or garbage collection) drops it. Usable as a context manager."""
+
+    def __init__(self, spool: "UploadSpool", path: str):
+        self.path = path
+        self._release = weakref.finalize(self, spool._release, path)
+
+    @property
+    def digest(self) -> str:
+        """Content hash of the file (the first 128 bits of its SHA-256, hex)."""
+        return os.path.splitext(os.path.basename(self.path))[0]
+
+    @property
+    def released(self) -> bool:
+        return not self._release.alive
+
+    def release(self):
+        self._release()             # runs at most once
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class UploadSpool:
+    """Process-wide, content-addressed store of uploaded files in a private temp directory.
+
+    add() returns an UploadRef; the file is deleted when its reference count
+    drops to zero, and the whole directory when the process exits.
+    """
+
+    def __init__(self, root: str = None, chunk_size: int = CHUNK_SIZE):
+        self.root = root or tempfile.mkdtemp(prefix="engagement-uploads-")
+        os.makedirs(self.root, exist_ok=True)
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self._refs = {}             # path -> reference count
+        self._keys = {}             # caller key (e.g. an upload's file_id) -> path
+
+    def add(self, fileobj, suffix: str = "", key=None) -> UploadRef:
+        """Spool a readable binary file object and return a reference to its on-disk copy.
+
+        With a key already seen (and its file still referenced) nothing is read
+        again; otherwise the content is streamed to disk while hashed, and an
+        identical file that is already spooled is reused.
+        """
+        if key is not None:
+            with self._lock:
+                path = self._keys.get(key)
+                if path in self._refs:
+                    self._refs[path] += 1
+                    return UploadRef(self, path)
+
+        digest = hashlib.sha256()
+        fd, part = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            if hasattr(fileobj, "seek"):
+                fileobj.seek(0)
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = fileobj.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            os.unlink(part)
+            raise
+
+        path = os.path.join(self.root, digest.hexdigest()[:32] + suffix.lower())
+        with self._lock:
+            if path in self._refs:
+                os.unlink(part)                 # same content already spooled
+            else:
+                os.replace(part, path)
+                self._refs[path] = 0
+            self._refs[path] += 1
+            if key is not None:
+                self._keys[key] = path
+        return UploadRef(self, path)
+
+    def _release(self, path: str):
+        with self._lock:
+            n = self._refs.get(path, 0) - 1
+            if n > 0:
+                self._refs[path] = n
+                return
+            self._refs.pop(path, None)
+            for k in [k for k, p in self._keys.items() if p == path]:
+                del self._keys[k]
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def __len__(self):
+        return len(self._refs)
+
+    def close(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+_spool = None
+_spool_lock = threading.Lock()
+
+
+def get_upload_spool() -> UploadSpool:
+    """The process-wide UploadSpool, created on first use and removed at exit."""
+    global _spool
+    if _spool is None:
+        with _spool_lock:
+            if _spool is None:
+                _spool = UploadSpool()
+                atexit.register(_spool.close)
+    return _spool
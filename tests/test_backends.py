@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from engagement import backends, engine as engine_mod
+from engagement.backends import available_backends
+from engagement.detectors import DetectorPool, has_mediapipe
+from engagement.engine import EngagementEngine, PROBE_FACES, resolve_backend
+from engagement.regions import SeatMap
+from engagement.synthetic import SyntheticHall
+
+
+def test_auto_picks_the_fastest_backend(monkeypatch):
+    # Synthetic probe frames: only the cascade finds the drawn faces
+    probe = {"haar": {"fps": 9.0, "faces": 5}, "dnn": {"fps": 14.0, "faces": 0},
+             "facemesh": {"fps": 11.0, "faces": 2}}
+    monkeypatch.setattr(engine_mod, "probe_backends", lambda frame=None, expected_faces=None: probe)
+    assert resolve_backend("auto") == "dnn"
+    probe["facemesh"]["fps"] = 30.0
+    assert resolve_backend("auto") == "facemesh"
+
+
+def test_auto_skips_backends_blind_on_a_real_frame(monkeypatch):
+    probe = {"haar": {"fps": 9.0, "faces": 4}, "dnn": {"fps": 14.0, "faces": 0}}
+    monkeypatch.setattr(engine_mod, "probe_backends", lambda frame=None, expected_faces=None: probe)
+    frame = np.zeros((480, 640, 3), np.uint8)
+    assert resolve_backend("auto", frame=frame) == "haar"
+    probe["haar"]["faces"] = 0                          # nobody sees a face: fall back to speed
+    assert resolve_backend("auto", frame=frame) == "dnn"
+
+
+def test_probe_measures_every_backend():
+    probe = engine_mod.probe_backends(runs=1)
+    assert (None, PROBE_FACES) in engine_mod._probe_results
+    assert set(probe) == set(available_backends()) and all(p["fps"] > 0 for p in probe.values())
+    assert resolve_backend("auto") == max(probe, key=lambda b: probe[b]["fps"])
+    real = SyntheticHall(320, 240, 4).frame(0)
+    engine_mod.probe_backends(real, runs=1)
+    assert ((240, 320, 3), PROBE_FACES) in engine_mod._probe_results
+
+
+@pytest.mark.skipif(not has_mediapipe(), reason="mediapipe not installed")
+def test_facemesh_tracks_more_than_one_face_without_expected_students():
+    engine = EngagementEngine(backend="facemesh")
+    try:
+        assert engine.analyze_frame(SyntheticHall(640, 480, 6).frame(0)).faces_detected > 1
+    finally:
+        engine.backend.close()
+
+
+class FakeNet:
+    """CenterFace stand-in returning the same boxes for every frame."""
+
+    boxes = [(60, 60, 40, 40), (500, 380, 40, 40)]
+    widths = []
+
+    def detect(self, frames, width=640):
+        self.widths.append(width)
+        return [list(self.boxes) for _ in frames]
+
+
+def dnn_detect(engine, monkeypatch, n=1):
+    monkeypatch.setattr(backends, "get_dnn_pool", lambda: DetectorPool(factory=FakeNet))
+    frames = [np.zeros((480, 640, 3), np.uint8)] * n
+    return [boxes for boxes, _, _ in backends.DnnBackend(engine).detect_faces(frames, [f[:, :, 0] for f in frames])]
+
+
+def test_dnn_keeps_only_faces_in_seats(monkeypatch):
+    engine = EngagementEngine(seat_map=SeatMap.grid(1, 2, bounds=(0.0, 0.0, 1.0, 0.5)))
+    assert dnn_detect(engine, monkeypatch) == [[(60, 60, 40, 40)]]
+
+
+def test_dnn_honours_learned_region_mask(monkeypatch):
+    engine = EngagementEngine(region_mask=True)
+    FakeNet.boxes = [(60, 60, 40, 40)]
+    dnn_detect(engine, monkeypatch, n=5)                     # warm-up passes learn the top-left face
+    FakeNet.boxes = [(60, 60, 40, 40), (500, 380, 40, 40)]
+    masked, *_, rescan = dnn_detect(engine, monkeypatch, n=6)
+    assert masked == [(60, 60, 40, 40)]                       # outside the mask: ignored…
+    assert rescan == FakeNet.boxes                            # …until the periodic full rescan
+
+
+@pytest.mark.parametrize("detection_width", [None, 320])
+def test_dnn_runs_at_the_detection_width(monkeypatch, detection_width):
+    FakeNet.widths = []
+    dnn_detect(EngagementEngine(detection_width=detection_width), monkeypatch)
+    assert FakeNet.widths == [detection_width]              # None: full frame width ("Full" resolution)
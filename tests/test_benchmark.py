@@ -0,0 +1,18 @@
+from engagement.benchmark import compare, format_table, run_scenario, run_suite
+from engagement.synthetic import SyntheticHall
+
+
+def test_synthetic_scenario():
+    r = run_scenario(320, 240, 2, frames=4, warmup=1)
+    assert r["name"] == "320x240-2f-haar" and r["frames"] == 4 and r["video"] is None
+    assert r["recall"] is not None and r["faces_per_frame"] >= 0
+    assert compare({"scenarios": [r]}, {"scenarios": [r]}) == []
+
+
+def test_recording_scenario(tmp_path):
+    path = str(tmp_path / "lecture.avi")
+    SyntheticHall(320, 240, 2).write_video(path, 6)
+    results = run_suite(face_counts=[10], videos=[path], frames=4, warmup=1)
+    (r,) = results["scenarios"]
+    assert r["name"] == "lecture-10f-haar" and (r["width"], r["height"]) == (320, 240)
+    assert r["recall"] is None and "faces/frame" in format_table(results)
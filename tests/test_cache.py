@@ -0,0 +1,107 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from engagement import cache as cache_mod
+from engagement.cache import Checkpointer, ResultCache, cache_key
+from engagement.regions import SeatMap
+from engagement.store import ResultTable
+
+
+def table(n, start=1):
+    t = ResultTable()
+    for i in range(start, start + n):
+        t.append(i, i / 25, {"engagement_score": float(i), "faces_detected": 3, "eyes_detected": 6,
+                             "head_down_count": 0, "distracted_count": 1, "alerts": []})
+    return t
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Strictly increasing time.time(), so last_used orders entries deterministically."""
+    ticks = itertools.count(1_000_000)
+    monkeypatch.setattr(cache_mod.time, "time", lambda: float(next(ticks)))
+
+
+def test_cache_key_covers_video_settings_and_engine():
+    settings = {"frame_skip": 2, "engine": {"seat_map": SeatMap.grid(1, 2)}}
+    key = cache_key("abc", settings)
+    assert key == cache_key("abc", dict(settings))
+    assert key != cache_key("abd", settings)
+    assert key != cache_key("abc", {**settings, "frame_skip": 3})
+    assert key != cache_key("abc", settings, engine_version=-1)
+
+
+def test_round_trip(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    assert cache.get("k") is None
+    cache.put("k", table(50))
+    assert np.array_equal(cache.get("k").to_numpy(), table(50).to_numpy())
+    assert ResultCache(str(tmp_path)).get("k") is not None             # another session / process
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    entry = len(table(100).to_numpy().tobytes()) + 128                  # rows + .npy header
+    cache = ResultCache(str(tmp_path), max_bytes=int(2.5 * entry))
+    cache.put("a", table(100))
+    cache.put("b", table(100))
+    assert cache.get("a") is not None                                   # a is now the more recent
+    cache.put("c", table(100))
+    assert cache.get("b") is None and not (tmp_path / "b.npy").exists()
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["entries"] == 2 and cache.stats()["bytes"] <= cache.max_bytes
+
+    cache.clear()
+    assert cache.stats()["entries"] == 0 and not list(tmp_path.glob("*.npy"))
+
+
+def test_missing_file_is_a_miss(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put("k", table(5))
+    (tmp_path / "k.npy").unlink()
+    assert cache.get("k") is None and cache.stats()["entries"] == 0
+
+
+def test_checkpoints_append_and_resume(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    run = Checkpointer(cache, "k", total_frames=500, interval=0.0)
+    rows = table(40)
+    assert run.save(rows, 80) and cache.checkpoint_info("k")["rows"] == 40
+    rows.extend(table(20, start=41))
+    assert run.save(rows, 120)
+    info = cache.checkpoint_info("k")
+    assert (info["rows"], info["position"], info["total_frames"]) == (60, 120, 500)
+
+    resumed, position = Checkpointer(cache, "k").resume()
+    assert position == 120 and np.array_equal(resumed.to_numpy(), rows.to_numpy())
+
+    cache.put("k", rows)                                                # completed: checkpoint dropped
+    assert cache.checkpoint_info("k") is None and not (tmp_path / "k.rows").exists()
+
+
+def test_checkpoint_taken_over_by_another_session(tmp_path):
+    first = Checkpointer(ResultCache(str(tmp_path)), "k", interval=0.0)
+    assert first.save(table(30), 60)
+
+    second = Checkpointer(ResultCache(str(tmp_path)), "k", interval=0.0)    # e.g. a rerun in another tab
+    resumed, position = second.resume()
+    assert (len(resumed), position) == (30, 60)
+
+    assert not first.save(table(50), 100) and first.superseded and not first.due()
+    assert second.save(table(45), 90)
+    assert ResultCache(str(tmp_path)).checkpoint_info("k")["rows"] == 45     # first wrote nothing more
+
+
+def test_truncated_checkpoint_is_dropped(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    Checkpointer(cache, "k", interval=0.0).save(table(30), 60)
+    with open(tmp_path / "k.rows", "r+b") as f:
+        f.truncate(100)
+    assert cache.load_checkpoint("k") is None and cache.checkpoint_info("k") is None
+
+
+def test_without_a_cache_checkpoints_are_no_ops():
+    run = Checkpointer(None, "k", interval=0.0)
+    resumed, position = run.resume()
+    assert (len(resumed), position) == (0, 0) and run.save(table(3), 6) and not run.due()
@@ -0,0 +1,115 @@
+import time
+
+import numpy as np
+import pytest
+
+from engagement import cameras
+from engagement.cameras import SharedCamera, discover_cameras, invalidate_cameras, open_camera, subscribe_source
+
+
+class FakeCapture:
+    """cv2.VideoCapture stand-in: a 20 fps device delivering `n_frames` frames, then failing."""
+
+    opened = []
+
+    def __init__(self, index, api=None, n_frames=10_000):
+        self.index, self.n_frames, self.pos, self.released = index, n_frames, 0, False
+        FakeCapture.opened.append(self)
+
+    def isOpened(self):
+        return not self.released
+
+    def read(self):
+        time.sleep(0.05)
+        if self.pos >= self.n_frames:
+            return False, None
+        self.pos += 1
+        return True, np.full((48, 64, 3), self.pos % 256, np.uint8)
+
+    def set(self, prop, value):
+        return True
+
+    def get(self, prop):
+        return 0.0
+
+    def release(self):
+        self.released = True
+
+
+@pytest.fixture
+def fake_cv2(monkeypatch):
+    FakeCapture.opened = []
+    monkeypatch.setattr(cameras.cv2, "VideoCapture", FakeCapture)
+    monkeypatch.setattr(cameras, "_discovered", None)
+    yield
+    cameras.close_sources()
+    for cap in FakeCapture.opened:
+        assert wait_for(lambda: cap.released)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_sessions_share_one_open_device(fake_cv2):
+    a, b = open_camera(0), open_camera(0)
+    assert a.source is b.source and len(FakeCapture.opened) == 1
+    assert a.read()[0] and b.read()[0]
+    a.release()
+    assert b.isOpened() and b.grab() and not a.isOpened()
+
+
+def test_reader_gets_only_the_newest_frame(fake_cv2):
+    reader = open_camera(0)
+    assert reader.grab()
+    seen = reader._seq
+    time.sleep(0.3)                                     # the source keeps reading meanwhile (~6 frames)
+    newest = reader.source._seq
+    assert reader.grab(timeout=0.0)
+    assert reader._seq >= newest and reader._seq - seen >= 4       # skipped straight to the newest
+    assert not reader.grab(timeout=0.0)                 # nothing unseen yet
+
+
+def test_unwatched_device_closes_after_the_idle_timeout(fake_cv2):
+    reader = subscribe_source(0, lambda: SharedCamera(0, idle_timeout=0.2))
+    source = reader.source
+    assert reader.grab()
+    reader.release()
+    assert wait_for(lambda: source.closed) and wait_for(lambda: FakeCapture.opened[0].released)
+    assert wait_for(lambda: 0 not in cameras._sources)
+    assert open_camera(0).source is not source and len(FakeCapture.opened) == 2
+
+
+def test_resubscribing_before_the_timeout_keeps_the_device(fake_cv2):
+    reader = subscribe_source(0, lambda: SharedCamera(0, idle_timeout=0.5))
+    reader.release()
+    time.sleep(0.2)
+    again = open_camera(0)
+    time.sleep(0.5)
+    assert again.source is reader.source and again.isOpened() and len(FakeCapture.opened) == 1
+
+
+def test_failed_device_reports_and_is_probed_again(fake_cv2, monkeypatch):
+    monkeypatch.setattr(cameras, "_probe", lambda i: i == 0)
+    assert discover_cameras() == [0]
+    reader = subscribe_source(0, lambda: SharedCamera(0))
+    FakeCapture.opened[0].n_frames = 0                  # unplugged
+    assert wait_for(lambda: not reader.isOpened())
+    assert not reader.grab() and reader.source.error == "Frame capture failed."
+    assert cameras._discovered is None
+
+
+def test_discovery_is_cached_until_invalidated(fake_cv2, monkeypatch):
+    probes = []
+    monkeypatch.setattr(cameras, "_probe", lambda i: probes.append(i) or i == 1)
+    assert discover_cameras() == [1] and discover_cameras() == [1]
+    assert probes == [0, 1, 2]
+    invalidate_cameras()
+    assert discover_cameras() == [1] and len(probes) == 6
+    discover_cameras(force=True)
+    assert len(probes) == 9
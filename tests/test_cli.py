@@ -0,0 +1,40 @@
+import json
+
+from engagement import cli, engine as engine_mod
+from engagement.cli import main
+from engagement.synthetic import SyntheticHall
+
+
+def test_report_write_error_fails_only_that_recording(tmp_path):
+    rec = tmp_path / "recordings"
+    rec.mkdir()
+    hall = SyntheticHall(320, 240, n_faces=2)
+    for name in ("a.avi", "b.avi"):
+        hall.write_video(str(rec / name), 12)
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "a").write_text("a file where a's report folder goes")
+
+    assert main([str(rec), "-o", str(out), "-w", "1", "--frame-skip", "3"]) == 1
+
+    index = {r["recording"]: r for r in json.loads((out / "index.json").read_text())}
+    assert "writing report" in index["a.avi"]["error"]
+    assert index["b.avi"]["error"] is None and index["b.avi"]["frames"] == 4
+    assert (out / "b" / "summary.json").exists()
+
+
+def test_auto_backend_is_probed_once_on_the_first_recording(tmp_path, monkeypatch):
+    rec = tmp_path / "recordings"
+    rec.mkdir()
+    SyntheticHall(320, 240, n_faces=2).write_video(str(rec / "a.avi"), 6)
+    probed = []
+
+    def probe_backends(frame=None, expected_faces=None):
+        probed.append(None if frame is None else frame.shape)
+        return {"haar": {"fps": 5.0, "faces": 2}, "dnn": {"fps": 50.0, "faces": 0}}
+
+    seen = {}
+    monkeypatch.setattr(engine_mod, "probe_backends", probe_backends)
+    monkeypatch.setattr(cli, "analyze_videos_parallel", lambda paths, engine_kwargs, **kw: seen.update(engine_kwargs))
+    main([str(rec), "-o", str(tmp_path / "out"), "--backend", "auto"])
+    assert probed == [(240, 320, 3)] and seen["backend"] == "haar"
@@ -0,0 +1,52 @@
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from engagement.display import DisplayEncoder, downscale
+
+
+@pytest.mark.parametrize("size, max_width, shown", [
+    ((1920, 1080), 800, (800, 450)),        # two halvings, then bilinear
+    ((1280, 720), 640, (640, 360)),         # exact halving
+    ((640, 480), 800, (640, 480)),          # never upscaled
+])
+def test_downscale(size, max_width, shown):
+    w, h = size
+    assert downscale(np.zeros((h, w, 3), np.uint8), max_width).shape[1::-1] == shown
+
+
+def test_encode_sends_jpeg_at_display_width():
+    jpeg = DisplayEncoder(max_width=400, quality=60).encode(np.full((720, 1280, 3), 128, np.uint8))
+    assert jpeg[:2] == b"\xff\xd8"
+    assert cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR).shape == (225, 400, 3)
+
+
+class SlowPlaceholder:
+    """st.empty() stand-in taking `delay` seconds to accept each frame."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.frames = 0
+
+    def image(self, data, **kwargs):
+        time.sleep(self.delay)
+        self.frames += 1
+
+
+def test_show_caps_the_display_rate():
+    enc, ph = DisplayEncoder(max_width=160, max_fps=10.0), SlowPlaceholder()
+    frame = np.zeros((120, 160, 3), np.uint8)
+    assert enc.show(ph, frame)
+    assert not enc.show(ph, frame) and not enc.due()          # within 1 / max_fps of the last frame
+    assert enc.show(ph, frame, force=True)
+    assert ph.frames == 2 and enc.sent == 2
+
+
+def test_slow_sends_lower_the_display_rate():
+    enc = DisplayEncoder(max_width=160, max_fps=30.0, send_budget=0.5)
+    enc.show(SlowPlaceholder(0.05), np.zeros((120, 160, 3), np.uint8))
+    # ~50 ms to send at a 50% budget: at most one frame every ~100 ms, not every 33 ms
+    assert enc.interval() >= 0.09
+    assert enc.get_stats()["send_ms"] >= 50.0
@@ -0,0 +1,80 @@
+"""
+Live mode end to end: the app script run by Streamlit's AppTest against a
+fake camera serving synthetic hall footage, for several dashboard refreshes.
+"""
+
+import os
+import time
+from pathlib import Path
+
+import cv2
+import pytest
+
+from engagement.synthetic import SyntheticHall
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+APP = str(Path(__file__).resolve().parents[1] / "app.py")
+
+
+class FakeCapture:
+    """cv2.VideoCapture stand-in: n_frames of synthetic footage at fps, then read failures."""
+
+    hall = None
+    n_frames = 60
+    fps = 20.0
+
+    def __init__(self, *args, **kwargs):
+        if FakeCapture.hall is None:
+            FakeCapture.hall = SyntheticHall(640, 480, n_faces=4, fps=self.fps)
+        self.pos = 0
+        self._next = time.perf_counter()
+
+    def isOpened(self):
+        return True
+
+    def grab(self):
+        if self.pos >= self.n_frames:
+            return False
+        delay = self._next - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self._next = time.perf_counter() + 1.0 / self.fps
+        self.pos += 1
+        return True
+
+    def retrieve(self):
+        return True, self.hall.frame(self.pos)
+
+    def read(self):
+        return self.retrieve() if self.grab() else (False, None)
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FRAME_WIDTH: 640, cv2.CAP_PROP_FRAME_HEIGHT: 480, cv2.CAP_PROP_FPS: self.fps}.get(prop, 0.0)
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        pass
+
+
+@pytest.fixture
+def fake_camera(monkeypatch):
+    exists = os.path.exists
+    monkeypatch.setattr(os.path, "exists", lambda p: p == "/dev/video0" or exists(p))
+    monkeypatch.setattr(cv2, "VideoCapture", FakeCapture)
+    monkeypatch.delenv("STREAMLIT_SHARING_MODE", raising=False)
+
+
+def test_live_dashboard_refreshes(fake_camera):
+    at = AppTest.from_file(APP, default_timeout=120).run()
+    at.sidebar.radio[0].set_value("🔴 Live Webcam Stream").run()
+    [b for b in at.button if "START STREAM" in b.label][0].click().run()
+
+    assert not at.exception, [e.value for e in at.exception]
+    # The loop ends when the fake camera runs out of frames
+    assert [w.value for w in at.warning] == ["Frame capture failed."]
+    assert len(at.session_state["history"]) > 5
+    panels = " ".join(m.value for m in at.markdown)
+    assert "AVG:" in panels and "ANALYZED:" in panels
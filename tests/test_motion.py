@@ -0,0 +1,83 @@
+import numpy as np
+
+from engagement.engine import EngagementEngine
+from engagement.motion import FULL, PARTIAL, REUSE, MotionGate
+from engagement.synthetic import SyntheticHall
+
+W, H = 640, 360         # 20 px grid cells with the default 32x18 grid
+
+
+def hall():
+    rng = np.random.default_rng(0)
+    return rng.integers(60, 200, (H, W), dtype=np.uint8)
+
+
+def with_patch(gray, x0, y0, x1, y1, value=255):
+    out = gray.copy()
+    out[y0:y1, x0:x1] = value
+    return out
+
+
+def primed(gray, **kwargs):
+    gate = MotionGate(**kwargs)
+    assert gate.plan(gray) == (FULL, [])                 # no reference yet
+    gate.commit(FULL)
+    return gate
+
+
+def test_unchanged_frame_reuses_detections():
+    gray = hall()
+    gate = primed(gray)
+    assert gate.plan(gray) == (REUSE, []) and gate.motion == 0.0
+    noisy = np.clip(gray.astype(np.int16) + 3, 0, 255).astype(np.uint8)    # below the threshold
+    assert gate.plan(noisy)[0] == REUSE
+
+
+def test_local_change_is_searched_partially():
+    gray = hall()
+    gate = primed(gray)
+    mode, rects = gate.plan(with_patch(gray, 200, 100, 240, 140))
+    assert mode == PARTIAL and len(rects) == 1
+    x0, y0, x1, y1 = rects[0]
+    assert x0 <= 200 and y0 <= 100 and x1 >= 240 and y1 >= 140          # covers the change…
+    assert (x1 - x0) * (y1 - y0) < 0.1 * W * H                          # …and not much more
+    assert 0 < gate.motion < 0.05
+
+
+def test_region_grows_to_cover_a_face_it_touches():
+    gray = hall()
+    gate = primed(gray)
+    face = (230, 90, 60, 60)                                            # overlaps the changed area
+    _, [plain] = gate.plan(with_patch(gray, 200, 100, 240, 140))
+    _, [grown] = gate.plan(with_patch(gray, 200, 100, 240, 140), face_boxes=[face])
+    assert grown[2] >= 230 + 60 > plain[2] and grown[3] >= 90 + 60
+
+
+def test_large_change_and_refresh_interval_force_full_passes():
+    gray = hall()
+    gate = primed(gray)
+    assert gate.plan(with_patch(gray, 0, 0, W * 3 // 4, H)) == (FULL, [])
+    gate = primed(gray, refresh_interval=3)
+    assert [gate.plan(gray)[0] for _ in range(3)] == [REUSE, REUSE, FULL]
+
+
+def test_partial_commit_updates_the_reference_only_where_searched():
+    gray = hall()
+    gate = primed(gray)
+    moved = with_patch(with_patch(gray, 200, 100, 240, 140), 500, 260, 540, 300)
+    mode, rects = gate.plan(moved)
+    assert mode == PARTIAL and len(rects) == 2
+    gate.commit(PARTIAL, rects[:1], W, H)
+    mode, rest = gate.plan(moved)
+    assert mode == PARTIAL and rest == rects[1:]                        # the other region is still pending
+    gate.commit(PARTIAL, rest, W, H)
+    assert gate.plan(moved)[0] == REUSE
+
+
+def test_engine_reuses_detections_on_a_static_hall():
+    frame = SyntheticHall(640, 360, 4).frame(0)
+    engine = EngagementEngine(motion_gate=True)
+    first = engine.analyze_frame(frame)
+    second = engine.analyze_frame(frame.copy())
+    assert first.faces_detected > 0 and not first.reused and second.reused
+    assert second.faces_detected == first.faces_detected and second.engagement_score == first.engagement_score
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from engagement.engine import EngagementEngine
+from engagement.parallel import analyze_video_parallel, chunkable, plan_chunks
+from engagement.sampling import FrameSampler, iter_sampled_frames, open_video_at
+from engagement.store import ResultTable
+from engagement.synthetic import SyntheticHall
+
+FRAMES = 600            # > 2 * plan_chunks' min_chunk, so splittable runs use several chunks
+
+
+@pytest.fixture(scope="module")
+def video(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("video") / "hall.avi")
+    return SyntheticHall(480, 270, n_faces=4).write_video(path, FRAMES)
+
+
+def sequential(path, frame_skip, engine_kwargs):
+    engine = EngagementEngine(**engine_kwargs)
+    cap = open_video_at(path, 0)
+    records = ResultTable()
+    for frame_idx, frame in iter_sampled_frames(cap, FrameSampler(frame_skip, fps=25.0)):
+        records.append(frame_idx, frame_idx / 25.0, engine.analyze_frame(frame))
+    cap.release()
+    return records.to_numpy()
+
+
+@pytest.mark.parametrize("engine_kwargs", [
+    {"tracking": False},
+    {"tracking": True, "detect_interval": 10},
+    {"tracking": False, "motion_gate": True},
+])
+def test_parallel_matches_sequential(video, engine_kwargs):
+    assert len(plan_chunks(FRAMES, 2)) > 1
+    parallel = analyze_video_parallel(video, frame_skip=3, workers=2, engine_kwargs=engine_kwargs).to_numpy()
+    np.testing.assert_array_equal(parallel, sequential(video, 3, engine_kwargs))
+
+
+def test_chunkable():
+    assert chunkable(None) and chunkable({"tracking": False})
+    assert not chunkable({"tracking": True})
+    assert not chunkable({"region_mask": True}) and not chunkable({"motion_gate": True})
+    assert chunkable({"region_mask": True, "seat_map": object()})     # seat ROIs override the learned mask
+
+
+def test_chunk_cb_false_stops_the_run(video):
+    seen = []
+
+    def on_chunk(records, end):
+        seen.append(end)
+        return False                # e.g. the checkpoint was taken over by another session
+
+    records = analyze_video_parallel(video, frame_skip=3, workers=2, chunk_cb=on_chunk)
+    first_end = plan_chunks(FRAMES, 2)[0][1]
+    assert seen == [first_end]
+    np.testing.assert_array_equal(records.to_numpy(), sequential(video, 3, {})[:len(records)])
+    assert records.to_numpy()["frame"].max() <= first_end
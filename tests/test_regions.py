@@ -0,0 +1,24 @@
+import pytest
+
+from engagement.regions import SeatMap
+
+
+def test_seat_map_from_json():
+    seats = SeatMap.from_json('{"A1": [0.1, 0.2, 0.3, 0.4], "A2": [0.5, 0.2, 0.3, 0.4]}')
+    assert seats.seats == [("A1", (0.1, 0.2, 0.3, 0.4)), ("A2", (0.5, 0.2, 0.3, 0.4))]
+    assert seats.assign([(20, 30, 10, 10), (60, 40, 10, 10), (0, 0, 5, 5)], 100, 100) == [0, 1, -1]
+    assert [label for label, _ in SeatMap.from_json("[[0, 0, 0.5, 1], [0.5, 0, 0.5, 1]]").seats] == ["S1", "S2"]
+
+
+@pytest.mark.parametrize("text, where", [
+    ("[[0, 0, 10]]", "seat 0 (S1)"),
+    ('[[0, 0, 0.5, 1], [0, 0, 0, 1]]', "seat 1 (S2)"),
+    ('{"A1": [0, 0, 0.5, 1], "A2": [0, 0, 0.5, "1"]}', "seat 1 (A2)"),
+    ('{"A1": 5}', "seat 0 (A1)"),
+    ("[[0, 0, 0.5, NaN]]", "seat 0 (S1)"),
+    ("[[0, 0, true, 1]]", "seat 0 (S1)"),
+    ('"0,0,1,1"', "JSON list or object"),
+])
+def test_seat_map_rejects_bad_boxes(text, where):
+    with pytest.raises(ValueError, match=where.replace("(", r"\(").replace(")", r"\)")):
+        SeatMap.from_json(text)
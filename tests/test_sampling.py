@@ -0,0 +1,83 @@
+import pytest
+
+from engagement.sampling import AdaptiveSampler
+
+
+def simulate(sampler, cost, seconds=30.0, camera_fps=30.0):
+    """Drive sampler with a camera and one analysis worker in virtual time.
+
+    Like MonitoredStream, a selected frame waits in a one-slot queue (a newer one
+    replaces it) until the worker is free; each analysis takes `cost` seconds.
+    Returns the number of analyses and the latency of the last one.
+    """
+    busy_until, pending, done, latency = 0.0, None, 0, None
+
+    def finish_until(t):
+        nonlocal busy_until, pending, done, latency
+        while pending is not None and busy_until <= t:
+            start = max(busy_until, pending)
+            busy_until = start + cost
+            latency = busy_until - pending
+            sampler.record(cost, latency, now=busy_until)
+            pending, done = None, done + 1
+
+    for k in range(int(seconds * camera_fps)):
+        t = k / camera_fps
+        finish_until(t)
+        if sampler.should_analyze(t):
+            pending = t
+        finish_until(t)
+    return done, latency
+
+
+def test_a_budget_is_required():
+    with pytest.raises(ValueError):
+        AdaptiveSampler()
+
+
+def test_selects_frames_at_the_chosen_rate():
+    sampler = AdaptiveSampler(cpu_share=1.0)
+    sampler.rate = 10.0
+    picked = sum(sampler.should_analyze(k / 30) for k in range(90))
+    assert picked == 30
+    assert sampler.should_analyze(100.0) and not sampler.should_analyze(100.05)   # no catch-up burst
+
+
+def test_cpu_budget_converges_to_its_share_of_a_core():
+    sampler = AdaptiveSampler(cpu_share=0.25)
+    done, _ = simulate(sampler, cost=0.02, seconds=30)
+    assert sampler.limit == "cpu" and sampler.rate == pytest.approx(12.5, rel=0.01)
+    assert done / 30 == pytest.approx(12.5, rel=0.1)
+
+
+def test_cheap_analysis_is_capped_at_max_fps():
+    sampler = AdaptiveSampler(cpu_share=0.5, max_fps=15.0)
+    simulate(sampler, cost=0.005)
+    assert sampler.limit == "max" and sampler.rate == 15.0
+
+
+def test_latency_budget_is_met_at_the_sustainable_rate():
+    sampler = AdaptiveSampler(latency_ms=100.0)
+    _, latency = simulate(sampler, cost=0.06, seconds=60)
+    assert latency <= 0.1 and sampler.get_stats()["latency_ms"] <= 100.0
+    assert sampler.limit == "throughput" and sampler.rate == pytest.approx(0.9 / 0.06)
+
+
+def test_queueing_latency_cuts_the_rate_then_it_recovers():
+    sampler = AdaptiveSampler(latency_ms=100.0, update_interval=0.0)
+    sampler.record(0.02, 0.05, now=0.0)
+    sampler.rate = 10.0
+    for i in range(1, 6):                   # frames queue behind other halls: 300 ms from capture to result
+        sampler.record(0.02, 0.3, now=i)
+    assert sampler.limit == "latency" and sampler.rate < 2.0
+    cut = sampler.rate
+    for i in range(6, 40):
+        sampler.record(0.02, 0.03, now=i)
+    assert sampler.rate > cut + 3.0 and sampler.limit in ("latency", "max")
+
+
+def test_analysis_slower_than_the_latency_budget():
+    sampler = AdaptiveSampler(latency_ms=100.0, min_fps=0.5)
+    simulate(sampler, cost=0.2)
+    # Cutting the rate cannot bring one 200 ms analysis under 100 ms: it is held instead of collapsing
+    assert sampler.limit == "cost" and sampler.rate >= 0.5
@@ -0,0 +1,49 @@
+"""
+Stage Timing drives the process-wide METRICS registry: sessions of the app
+(two AppTest runs in this process) must not switch it for each other by rerunning.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from engagement.metrics import METRICS
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+APP = str(Path(__file__).resolve().parents[1] / "app.py")
+
+
+def timing_toggle(at):
+    return at.sidebar.toggle(key="perf_timing")
+
+
+@pytest.fixture
+def metrics_off():
+    METRICS.enable(False)
+    METRICS.export_to(None)
+    yield
+    METRICS.enable(False)
+    METRICS.export_to(None)
+
+
+def test_sessions_share_stage_timing(metrics_off, tmp_path):
+    prom = str(tmp_path / "engagement.prom")
+    a = AppTest.from_file(APP, default_timeout=60).run()
+    timing_toggle(a).set_value(True).run()
+    a.sidebar.text_input(key="metrics_file").set_value(prom).run()
+    assert METRICS.enabled and METRICS.export_path == prom
+
+    # A second session with timing at its default, rerunning, leaves it on for the first
+    b = AppTest.from_file(APP, default_timeout=60).run()
+    b.run()
+    a.run()
+    assert METRICS.enabled and METRICS.export_path == prom
+    assert timing_toggle(b).value and b.sidebar.text_input(key="metrics_file").value == prom
+
+    # Switching it off is a change of b's widget, and applies to everyone
+    timing_toggle(b).set_value(False).run()
+    assert not METRICS.enabled and METRICS.export_path is None
+    a.run()
+    assert not timing_toggle(a).value and not METRICS.enabled
+    assert not a.exception and not b.exception
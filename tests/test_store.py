@@ -0,0 +1,66 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from engagement.store import ResultRing, ResultTable
+
+
+def result(i, seats=None):
+    r = {"engagement_score": float(i), "faces_detected": i % 7, "eyes_detected": 2 * (i % 7),
+         "head_down_count": i % 2, "distracted_count": i % 3, "alerts": ["drop"] * (i % 2)}
+    if seats is not None:
+        r["seats"] = seats
+    return r
+
+
+def test_ring_keeps_the_newest_rows_in_order():
+    ring = ResultRing(capacity=5)
+    for i in range(12):
+        ring.append(i, i / 10, result(i))
+    assert len(ring) == 5 and ring.total == 12
+    assert list(ring.tail()["frame"]) == [7, 8, 9, 10, 11]
+    assert list(ring.tail(2)["score"]) == [10.0, 11.0]
+    assert np.shares_memory(ring.tail(), ring._buf)                     # a view, never a copy
+
+    df = ring.to_dataframe()
+    assert list(df["faces"]) == [0, 1, 2, 3, 4] and list(df["alerts"]) == [1, 0, 1, 0, 1]
+
+
+def test_table_round_trip_across_chunks():
+    table = ResultTable(chunk_size=4)
+    for i in range(10):
+        table.append(i + 1, i / 25, result(i))
+    rows = table.to_numpy()
+    assert len(table) == 10 and list(rows["frame"]) == list(range(1, 11))
+    assert table.to_numpy() is rows                                     # joined once, then reused
+
+    back = pickle.loads(pickle.dumps(table))
+    assert np.array_equal(back.to_numpy(), rows)
+    assert np.array_equal(ResultTable.from_numpy(rows).to_numpy(), rows)
+
+    merged = ResultTable.concat([table, back])
+    assert list(merged.to_numpy()["frame"]) == list(range(1, 11)) * 2
+
+
+def test_seat_columns_follow_the_first_result_with_seats():
+    table = ResultTable()
+    table.append(1, 0.0, result(1, seats=[{"seat": "A1", "score": 80.0}, {"seat": "A2", "score": None}]))
+    table.append(2, 0.1, result(2, seats=[{"seat": "A2", "score": 40.0}]))
+    cols = table.columns()
+    assert table.seat_labels == ("A1", "A2")
+    assert cols["seat:A1"][0] == 80.0 and np.isnan(cols["seat:A1"][1])   # empty seat is NaN
+    assert np.isnan(cols["seat:A2"][0]) and cols["seat:A2"][1] == 40.0
+
+    plain = ResultTable()
+    plain.append(3, 0.2, result(3))
+    with pytest.raises(ValueError):
+        table.extend(plain)                                             # different seat layout
+
+
+def test_arrow_export_maps_empty_seats_to_nulls():
+    pa = pytest.importorskip("pyarrow")
+    table = ResultTable()
+    table.append(1, 0.0, result(1, seats=[{"seat": "A1", "score": None}]))
+    arrow = table.to_arrow()
+    assert isinstance(arrow, pa.Table) and arrow.column("seat:A1").null_count == 1
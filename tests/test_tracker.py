@@ -0,0 +1,76 @@
+import numpy as np
+
+from engagement.tracker import FaceTracker, iou_matrix
+
+A, B = (100, 100, 40, 40), (300, 120, 40, 40)
+
+
+def shifted(box, dx):
+    x, y, w, h = box
+    return (x + dx, y, w, h)
+
+
+def ids(tracks):
+    return {t.track_id: t.box for t in tracks}
+
+
+def test_iou_matrix():
+    ious = iou_matrix(np.array([A, B]), np.array([A, shifted(A, 20)]))
+    assert ious.shape == (2, 2) and ious[0, 0] == 1.0 and ious[1, 0] == 0.0
+    assert abs(ious[0, 1] - 1 / 3) < 1e-6
+
+
+def test_ids_stay_with_their_faces():
+    tracker = FaceTracker()
+    first = ids(tracker.update([A, B], full=True))
+    assert sorted(first) == [1, 2]
+    for dx in range(2, 12, 2):
+        tracks = ids(tracker.update([shifted(B, dx), shifted(A, dx)], full=False))
+    assert tracks == {1: shifted(A, 10), 2: shifted(B, 10)}
+
+
+def test_new_tracks_start_only_on_full_passes():
+    tracker = FaceTracker()
+    tracker.update([A], full=True)
+    assert len(tracker.update([A, B], full=False)) == 1          # ROI pass: B ignored
+    assert ids(tracker.update([A, B], full=True)) == {1: A, 2: B}
+
+
+def test_track_dropped_after_max_missed():
+    tracker = FaceTracker(max_missed=2)
+    tracker.update([A, B], full=True)
+    for _ in range(2):
+        assert len(tracker.update([A], full=True)) == 2
+    assert ids(tracker.update([A], full=True)) == {1: A}
+
+
+def schedule(tracker, detections, n):
+    """Which of n analyzed frames get a full pass when `detections(full)` returns the boxes found."""
+    passes = []
+    for _ in range(n):
+        full = tracker.needs_full_detection()
+        passes.append(full)
+        tracker.update(detections(full), full=full)
+    return passes
+
+
+def test_detect_every_k_frames():
+    tracker = FaceTracker(detect_interval=4)
+    assert schedule(tracker, lambda full: [A, B], 9) == [True, False, False, False] * 2 + [True]
+    assert schedule(FaceTracker(detect_interval=1), lambda full: [A], 3) == [True] * 3
+
+
+def test_roi_miss_forces_one_full_pass():
+    tracker = FaceTracker(detect_interval=4)
+    tracker.update([A, B], full=True)
+    assert tracker.update([A], full=False) and tracker.needs_full_detection()
+
+
+def test_face_leaving_forces_one_full_pass_only():
+    # B leaves right after a full pass: its missed ROI update triggers one
+    # re-detection, which cannot find it either, and the schedule goes back
+    # to every K frames while the track ages out
+    tracker = FaceTracker(detect_interval=4, max_missed=20)
+    tracker.update([A, B], full=True)
+    assert schedule(tracker, lambda full: [A], 9) == [False, True, False, False, False, True, False, False, False]
+    assert [t.track_id for t in tracker.tracks] == [1, 2]
@@ -0,0 +1,85 @@
+import gc
+import hashlib
+import io
+import os
+
+import pytest
+
+from engagement.uploads import UploadSpool
+
+DATA = os.urandom(5000)
+
+
+class CountingFile(io.BytesIO):
+    """Uploaded-file stand-in that records how many bytes were read."""
+
+    read_bytes = 0
+
+    def read(self, n=-1):
+        chunk = super().read(n)
+        self.read_bytes += len(chunk)
+        return chunk
+
+
+@pytest.fixture
+def spool(tmp_path):
+    spool = UploadSpool(str(tmp_path / "spool"), chunk_size=1024)
+    yield spool
+    spool.close()
+
+
+def test_spooled_by_content_hash(spool):
+    ref = spool.add(io.BytesIO(DATA), suffix=".MP4")
+    assert ref.path.endswith(".mp4") and ref.digest == hashlib.sha256(DATA).hexdigest()[:32]
+    with open(ref.path, "rb") as f:
+        assert f.read() == DATA
+    assert not [n for n in os.listdir(spool.root) if n.endswith(".part")]
+
+
+def test_identical_content_shares_one_file_until_the_last_release(spool):
+    a = spool.add(io.BytesIO(DATA), ".mp4")
+    b = spool.add(io.BytesIO(DATA), ".mp4")
+    assert a.path == b.path and len(spool) == 1
+    a.release()
+    a.release()                                     # at most once per reference
+    assert os.path.exists(b.path)
+    with b:
+        pass
+    assert b.released and not os.path.exists(b.path) and len(spool) == 0
+
+
+def test_known_key_is_not_read_again(spool):
+    first = spool.add(io.BytesIO(DATA), ".mp4", key="file-1")
+    again = CountingFile(DATA)
+    second = spool.add(again, ".mp4", key="file-1")
+    assert second.path == first.path and again.read_bytes == 0
+
+    first.release()
+    second.release()
+    reread = CountingFile(DATA)
+    spool.add(reread, ".mp4", key="file-1")         # file gone: the key is forgotten with it
+    assert reread.read_bytes == len(DATA)
+
+
+def test_garbage_collected_reference_releases(spool):
+    path = spool.add(io.BytesIO(DATA)).path
+    gc.collect()
+    assert not os.path.exists(path) and len(spool) == 0
+
+
+def test_failed_upload_leaves_nothing_behind(spool):
+    class Broken(io.BytesIO):
+        def read(self, n=-1):
+            raise OSError("connection reset")
+
+    with pytest.raises(OSError):
+        spool.add(Broken(DATA))
+    assert os.listdir(spool.root) == [] and len(spool) == 0
+
+
+def test_close_removes_the_spool(tmp_path):
+    spool = UploadSpool(str(tmp_path / "spool"))
+    ref = spool.add(io.BytesIO(DATA))
+    spool.close()
+    assert not os.path.exists(spool.root)
+    ref.release()                                   # file already gone: no error